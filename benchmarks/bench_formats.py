@@ -0,0 +1,62 @@
+"""Benchmark saving and loading the ledger in each data file format.
+
+Times the sidebar export functions (save) and `read_transactions_file`
+(load) for Excel, CSV and Parquet, and checks that every round trip gives
+back the same five-column schema.
+
+Usage:
+    python benchmarks/bench_formats.py [--sizes 10000 100000] [--repeat 3]
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+
+from common import expense_core, make_ledger
+
+FORMATS = {
+    'xlsx': expense_core.export_to_excel,
+    'csv': expense_core.export_to_csv,
+    'parquet': expense_core.export_to_parquet,
+}
+
+
+def best_of(func, repeat):
+    """(best wall time in seconds, last result) over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'format':>8}  {'save (s)':>9}  {'load (s)':>9}  {'size (MB)':>9}")
+    for n in args.sizes:
+        store = expense_core.TransactionStore()
+        store.extend(make_ledger(n))
+
+        for extension, export in FORMATS.items():
+            save_time, data = best_of(lambda: export(store).getvalue(), args.repeat)
+            load_time, (df, rejected) = best_of(
+                lambda: expense_core.read_transactions_file(io.BytesIO(data), f'ledger.{extension}'),
+                args.repeat
+            )
+
+            assert list(df.columns) == expense_core.TRANSACTION_COLUMNS and len(df) == n and not rejected
+            np.testing.assert_array_equal(
+                expense_core.to_cents(df['Amount']), store.frame['Amount'].to_numpy()
+            )
+
+            print(f"{n:>10,}  {extension:>8}  {save_time:>9.3f}  {load_time:>9.3f}  {len(data) / 1e6:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
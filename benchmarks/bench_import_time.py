@@ -0,0 +1,84 @@
+"""Measure the cold-start import cost of the app with `python -X importtime`.
+
+Imports `expense_tracker` in fresh interpreters and reports the median
+cumulative import time. Exits non-zero if a module that should be loaded
+lazily (altair, matplotlib, seaborn, reportlab) is imported at startup, or if the
+import time regresses past the saved baseline by more than the tolerance.
+tests/test_imports.py runs the same lazy-module check under pytest.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 5] [--tolerance 1.5] [--update]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'import_time_baseline.json')
+
+# Modules that only the Analytics charts and the PDF export need
+LAZY_MODULES = ['altair', 'matplotlib', 'seaborn', 'reportlab']
+
+
+def measure_import():
+    """(cumulative microseconds for expense_tracker, set of top-level modules imported)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import expense_tracker'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, EXPENSE_TRACKER_DB='')
+    )
+    cumulative = None
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules.add(name.split('.')[0])
+        if name == 'expense_tracker':
+            cumulative = int(cumulative_us)
+    return cumulative, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help="allowed ratio of measured to baseline import time")
+    parser.add_argument('--update', action='store_true', help="save this measurement as the new baseline")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        cumulative, modules = measure_import()
+        timings.append(cumulative)
+    median_ms = statistics.median(timings) / 1000
+    print(f"expense_tracker import: {median_ms:.0f} ms (median of {args.runs})")
+
+    failures = []
+    eager = sorted(set(LAZY_MODULES) & modules)
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+
+    if args.update:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({'import_ms': round(median_ms)}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {os.path.relpath(BASELINE_PATH, ROOT)}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline_ms = json.load(f)['import_ms']
+        print(f"baseline: {baseline_ms} ms (tolerance {args.tolerance:.1f}x)")
+        if median_ms > baseline_ms * args.tolerance:
+            failures.append(f"import time {median_ms:.0f} ms exceeds {args.tolerance:.1f}x baseline {baseline_ms} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark PDF report generation time and peak memory.
+
+Runs `export_to_pdf` in each report mode at several ledger sizes and records
+wall time, peak traced memory, output size and page count. `--legacy` also
+times the original single-table layout for comparison (slow past ~10k rows).
+
+Usage:
+    python benchmarks/bench_pdf.py [--sizes 1000 10000 50000] [--legacy]
+"""
+import argparse
+import functools
+import io
+import re
+import time
+import tracemalloc
+
+from common import expense_core, make_ledger
+
+MODES = {
+    'chunked': dict(scope='all'),
+    'by month': dict(scope='all', group_by_month=True),
+    'last 3 months': dict(scope='recent', months=3),
+    'summary only': dict(scope='summary'),
+}
+
+
+def legacy_export_to_pdf(store):
+    """The original layout: every transaction in one Table"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+    from reportlab.lib import colors
+
+    df = store.frame
+    buffer = io.BytesIO()
+    table = Table([expense_core.TRANSACTION_COLUMNS] + list(zip(
+        df['Date'].dt.strftime('%Y-%m-%d'), df['Category'], df['Description'], df['Amount'], df['Type']
+    )))
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    SimpleDocTemplate(buffer, pagesize=letter).build([table])
+    buffer.seek(0)
+    return buffer
+
+
+def measure(export):
+    """(seconds, peak MB, output bytes) for one PDF build.
+
+    Time and memory come from separate runs because tracing allocations
+    slows reportlab down several times over.
+    """
+    start = time.perf_counter()
+    data = export().getvalue()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    export()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--legacy', action='store_true', help="also time the original single-table layout")
+    args = parser.parse_args()
+
+    modes = dict(MODES)
+    if args.legacy:
+        modes['legacy'] = None
+
+    # Load reportlab and its fonts before anything is timed
+    store = expense_core.TransactionStore()
+    store.extend(make_ledger(10))
+    expense_core.export_to_pdf(store)
+
+    print(f"{'rows':>8}  {'mode':>14}  {'time (s)':>9}  {'peak (MB)':>9}  {'size (KB)':>9}  {'pages':>6}")
+    for n in args.sizes:
+        store = expense_core.TransactionStore()
+        store.extend(make_ledger(n))
+
+        for mode, options in modes.items():
+            if options is None:
+                export = functools.partial(legacy_export_to_pdf, store)
+            else:
+                export = functools.partial(expense_core.export_to_pdf, store, **options)
+            elapsed, peak_mb, data = measure(export)
+            pages = len(re.findall(rb'/Type /Page\b', data))
+            print(f"{n:>8,}  {mode:>14}  {elapsed:>9.2f}  {peak_mb:>9.1f}  {len(data) / 1e3:>9.0f}  {pages:>6}")
+
+
+if __name__ == '__main__':
+    main()
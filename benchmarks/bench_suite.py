@@ -0,0 +1,272 @@
+"""Benchmark the app's hot paths on synthetic ledgers and check for regressions.
+
+Times the transaction functions, the analytics aggregations, the report
+exports and upload parsing at several ledger sizes, prints the results and
+compares them with the saved baseline. Exits non-zero if any case got slower
+than the baseline by more than the tolerance.
+
+Runs headless: outside `streamlit run` the app's `st.session_state` is the
+bare-mode session state, which each case fills with its own store.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1000 10000 100000 1000000] [--repeat 3]
+                                     [--cases NAME ...] [--tolerance 1.5] [--update]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import expense_core, make_ledger
+
+# Running the app code outside `streamlit run` logs a bare-mode warning on
+# every session state access; keep them out of the benchmark output
+logging.disable(logging.WARNING)
+import expense_tracker  # noqa: E402
+
+st = expense_tracker.st
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suite_baseline.json')
+
+# Operations repeated inside one timing for the cases that are too quick to time alone
+SINGLE_ADDS = 1_000
+SINGLE_DELETES = 100
+TOTALS_CALLS = 10_000
+
+
+def use_store(df=None):
+    """Attach a fresh in-memory store, optionally holding `df`, to the session"""
+    store = expense_core.TransactionStore()
+    if df is not None:
+        store.extend(df)
+    st.session_state.store = store
+    return store
+
+
+def upload(data, name):
+    """An in-memory stand-in for a Streamlit UploadedFile"""
+    file = io.BytesIO(data)
+    file.name = name
+    return file
+
+
+def case_add_transaction(df):
+    use_store(df)
+
+    def run():
+        for i in range(SINGLE_ADDS):
+            expense_tracker.add_transaction(
+                pd.Timestamp('2024-06-01'), 'Food & Dining', f'Lunch {i}', 12.5, 'Expense'
+            )
+        st.session_state.store.frame  # fold the buffered rows
+    return run
+
+
+def case_add_transactions_from_dataframe(df):
+    use_store()
+    return lambda: expense_tracker.add_transactions_from_dataframe(df)
+
+
+def case_append_skip_duplicates(df):
+    """Append a tenth of the ledger's size, half of it already stored"""
+    upload = pd.concat([df.iloc[-len(df) // 20:], make_ledger(len(df) // 20, seed=1)], ignore_index=True)
+    use_store(df)
+    return lambda: expense_tracker.add_transactions_from_dataframe(upload, validate=False, skip_duplicates=True)
+
+
+def case_delete_transaction(df):
+    store = use_store(df)
+    ids = np.random.default_rng(0).choice(store.frame.index, min(SINGLE_DELETES, len(df)), replace=False)
+
+    def run():
+        for transaction_id in ids:
+            expense_tracker.delete_transaction(transaction_id)
+    return run
+
+
+def case_undo_redo(df):
+    """Undo single deletes one by one, then redo them"""
+    store = use_store(df)
+    for transaction_id in np.random.default_rng(0).choice(store.frame.index, min(SINGLE_DELETES, len(df)),
+                                                          replace=False):
+        expense_tracker.delete_transaction(transaction_id)
+
+    def run():
+        for _ in range(SINGLE_DELETES):
+            expense_tracker.undo_last_change()
+        for _ in range(SINGLE_DELETES):
+            expense_tracker.redo_last_change()
+    return run
+
+
+def case_calculate_totals(df):
+    use_store(df)
+
+    def run():
+        for _ in range(TOTALS_CALLS):
+            expense_tracker.calculate_totals()
+    return run
+
+
+def case_income_expense_over_time(df):
+    store = use_store(df)
+    return lambda: expense_core.income_expense_over_time(store.frame)
+
+
+def case_category_totals(df):
+    store = use_store(df)
+    return lambda: store.category_totals('Expense')
+
+
+def case_monthly_summary(df):
+    store = use_store(df)
+    return lambda: (store.monthly_summary(), store.daily_totals())
+
+
+def case_cumulative_chart(df):
+    """Daily rollup read, LTTB downsampling and the Vega-Lite spec of the cumulative chart"""
+    store = use_store(df)
+    return lambda: expense_core.cumulative_chart(
+        expense_core.downsample_cumulative(store.daily_totals(), expense_core.CHART_MAX_POINTS)
+    ).to_dict()
+
+
+def case_export_to_excel(df):
+    store = use_store(df)
+    return lambda: expense_core.export_to_excel(store)
+
+
+def case_export_to_pdf(df):
+    store = use_store(df)
+    return lambda: expense_core.export_to_pdf(store)
+
+
+def case_upload_csv(df):
+    store = use_store(df)
+    data = expense_core.export_to_csv(store).getvalue()
+    expense_tracker.get_upload_cache.clear()
+    return lambda: expense_tracker.process_uploaded_file(upload(data, 'ledger.csv'))
+
+
+def case_upload_xlsx(df):
+    store = use_store(df)
+    data = expense_core.export_to_excel(store).getvalue()
+    expense_tracker.get_upload_cache.clear()
+    return lambda: expense_tracker.process_uploaded_file(upload(data, 'ledger.xlsx'))
+
+
+def case_upload_cached(df):
+    """A rerun with the same file still in the uploader"""
+    store = use_store(df)
+    data = expense_core.export_to_csv(store).getvalue()
+    expense_tracker.get_upload_cache.clear()
+    expense_tracker.process_uploaded_file(upload(data, 'ledger.csv'))
+    return lambda: expense_tracker.process_uploaded_file(upload(data, 'ledger.csv'))
+
+
+# name -> (setup(df) returning the timed callable, largest ledger size worth timing)
+CASES = {
+    'add_transaction': (case_add_transaction, None),
+    'add_transactions_from_dataframe': (case_add_transactions_from_dataframe, None),
+    'append_skip_duplicates': (case_append_skip_duplicates, None),
+    'delete_transaction': (case_delete_transaction, None),
+    'undo_redo': (case_undo_redo, None),
+    'calculate_totals': (case_calculate_totals, None),
+    'income_expense_over_time': (case_income_expense_over_time, None),
+    'category_totals': (case_category_totals, None),
+    'monthly_summary': (case_monthly_summary, None),
+    'cumulative_chart': (case_cumulative_chart, None),
+    'export_to_excel': (case_export_to_excel, 100_000),
+    'export_to_pdf': (case_export_to_pdf, 100_000),
+    'process_uploaded_file[csv]': (case_upload_csv, None),
+    'process_uploaded_file[xlsx]': (case_upload_xlsx, 100_000),
+    'process_uploaded_file[cached]': (case_upload_cached, None),
+}
+
+
+def best_of(setup, df, repeat):
+    """Best wall time in seconds over `repeat` runs, each on freshly set-up state"""
+    timings = []
+    for _ in range(repeat):
+        run = setup(df)
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help="allowed ratio of measured to baseline time")
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help="ignore regressions in cases faster than this (timer noise)")
+    parser.add_argument('--update', action='store_true', help="merge these measurements into the baseline")
+    args = parser.parse_args()
+
+    baseline = {'environment': {}, 'results': {}}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = []
+    print(f"{'rows':>10}  {'case':<32}  {'time (s)':>9}  {'baseline':>9}  {'ratio':>6}")
+    for n in args.sizes:
+        df = make_ledger(n)
+        for name in args.cases:
+            setup, max_rows = CASES[name]
+            if max_rows is not None and n > max_rows:
+                continue
+            key = f'{name}@{n}'
+            seconds = best_of(setup, df, args.repeat)
+            results[key] = seconds
+
+            previous = baseline['results'].get(key)
+            if previous is None:
+                print(f"{n:>10,}  {name:<32}  {seconds:>9.4f}  {'-':>9}  {'-':>6}")
+                continue
+            ratio = seconds / previous
+            flag = ''
+            if ratio > args.tolerance and seconds > args.min_seconds:
+                flag = '  REGRESSION'
+                failures.append(f"{key} took {seconds:.4f}s, {ratio:.1f}x the baseline {previous:.4f}s")
+            print(f"{n:>10,}  {name:<32}  {seconds:>9.4f}  {previous:>9.4f}  {ratio:>5.2f}x{flag}")
+
+    if args.update:
+        baseline['environment'] = environment()
+        baseline['results'].update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {os.path.relpath(BASELINE_PATH)}")
+        failures = []
+    elif baseline['environment'] and baseline['environment'] != environment():
+        print(f"note: baseline was recorded on {baseline['environment']}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the "Income vs Expenses Over Time" pipeline.
+
+Compares the original row-wise `apply` implementation with the vectorized
+`income_expense_over_time` at several ledger sizes.
+
+Usage:
+    python benchmarks/bench_time_series.py [--sizes 10000 100000 1000000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from common import expense_core, make_ledger
+
+
+def legacy_income_expense_over_time(df):
+    """The original implementation from `main`, kept for comparison"""
+    df_sorted = df.sort_values('Date').copy()
+    df_sorted['Income'] = df_sorted.apply(lambda x: x['Amount'] if x['Type'] == 'Income' else 0, axis=1)
+    df_sorted['Expense'] = df_sorted.apply(lambda x: x['Amount'] if x['Type'] == 'Expense' else 0, axis=1)
+    daily_totals = df_sorted.groupby('Date').agg({
+        'Income': 'sum',
+        'Expense': 'sum'
+    }).reset_index()
+    daily_totals['Cumulative_Income'] = daily_totals['Income'].cumsum()
+    daily_totals['Cumulative_Expense'] = daily_totals['Expense'].cumsum()
+    df_sorted['Month'] = df_sorted['Date'].dt.to_period('M')
+    monthly_summary = df_sorted.groupby(['Month', 'Type'], observed=True)['Amount'].sum().unstack(fill_value=0)
+    monthly_summary['Balance'] = monthly_summary.get('Income', 0) - monthly_summary.get('Expense', 0)
+    return daily_totals, monthly_summary
+
+
+def best_of(func, df, repeat):
+    """Best wall time in seconds over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'legacy (s)':>11}  {'vectorized (s)':>14}  {'speedup':>8}")
+    for n in args.sizes:
+        df = make_ledger(n)
+
+        # Both implementations must agree before their timings mean anything
+        legacy_daily, _ = legacy_income_expense_over_time(df)
+        daily, _ = expense_core.income_expense_over_time(df)
+        np.testing.assert_allclose(
+            legacy_daily['Cumulative_Income'].to_numpy(), daily['Cumulative_Income'].to_numpy()
+        )
+
+        # The legacy path is slow enough that one run is plenty past 100k rows
+        legacy = best_of(legacy_income_expense_over_time, df, 1 if n > 100_000 else args.repeat)
+        vectorized = best_of(expense_core.income_expense_over_time, df, args.repeat)
+        print(f"{n:>10,}  {legacy:>11.3f}  {vectorized:>14.4f}  {legacy / vectorized:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
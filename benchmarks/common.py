@@ -0,0 +1,68 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep benchmark ledgers in memory rather than in the app's database
+os.environ.setdefault('EXPENSE_TRACKER_DB', '')
+
+import expense_core  # noqa: E402
+
+
+# Synthetic ledger profile: category -> (type, share of rows, median amount, descriptions).
+# Amounts are log-normal around the median; salaries land on the 25th of the month.
+LEDGER_PROFILE = {
+    'Food & Dining': ('Expense', 0.28, 25, ['Groceries', 'Lunch', 'Dinner out', 'Coffee', 'Food delivery']),
+    'Transportation': ('Expense', 0.14, 15, ['Fuel', 'Parking', 'Toll', 'Ride hailing', 'Train fare']),
+    'Shopping': ('Expense', 0.11, 80, ['Clothes', 'Electronics', 'Household items', 'Online order']),
+    'Bills & Utilities': ('Expense', 0.08, 150, ['Electricity', 'Water', 'Internet', 'Phone bill', 'Rent']),
+    'Entertainment': ('Expense', 0.07, 40, ['Cinema', 'Streaming subscription', 'Concert', 'Games']),
+    'Healthcare': ('Expense', 0.04, 90, ['Clinic visit', 'Pharmacy', 'Dental']),
+    'Education': ('Expense', 0.03, 200, ['Course fee', 'Books', 'Exam fee']),
+    'Travel': ('Expense', 0.03, 600, ['Flight', 'Hotel', 'Holiday package']),
+    'Other': ('Expense', 0.06, 30, ['Gift', 'Donation', 'Miscellaneous']),
+    'Salary': ('Income', 0.06, 5000, ['Monthly salary']),
+    'Freelance': ('Income', 0.05, 800, ['Client project', 'Consulting', 'Design job']),
+    'Investments': ('Income', 0.03, 300, ['Dividends', 'Interest', 'Capital gains']),
+    'Fund': ('Income', 0.02, 200, ['Savings fund', 'Family support']),
+}
+assert set(LEDGER_PROFILE) == set(expense_core.CATEGORIES)
+
+
+def make_ledger(n, seed=0, start='2022-01-01', years=3):
+    """Reproducible synthetic transactions over `years` years from `start`.
+
+    Categories are the ones offered by the sidebar form, drawn with the
+    shares in LEDGER_PROFILE, and each row gets the category's type and a
+    matching description.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(LEDGER_PROFILE)
+    types, shares, medians, descriptions = zip(*LEDGER_PROFILE.values())
+    shares = np.array(shares) / sum(shares)
+
+    codes = rng.choice(len(names), n, p=shares)
+    amounts = np.array(medians)[codes] * rng.lognormal(0, 0.6, n)
+
+    days = rng.integers(0, years * 365, n)
+    dates = pd.Timestamp(start) + pd.to_timedelta(days, unit='D')
+    is_salary = codes == names.index('Salary')
+    dates = dates.to_numpy(dtype='datetime64[ns]')
+    dates[is_salary] = dates[is_salary].astype('datetime64[M]') + np.timedelta64(24, 'D')
+
+    # Pick one of the category's descriptions from a flat table of all of them
+    counts = np.array([len(pool) for pool in descriptions])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    flat = np.array([text for pool in descriptions for text in pool], dtype=object)
+    picks = offsets[codes] + (rng.random(n) * counts[codes]).astype(int)
+    return pd.DataFrame({
+        'Date': dates,
+        'Category': pd.Categorical.from_codes(codes, names),
+        'Description': flat[picks],
+        'Amount': amounts.round(2).clip(0.01),
+        'Type': pd.Categorical(np.array(types, dtype=object)[codes], categories=expense_core.TRANSACTION_TYPES),
+    })
@@ -0,0 +1,35 @@
+"""Ledger storage, analytics, import and export without Streamlit.
+
+The Streamlit app (`expense_tracker.py`) is a thin layer over this package;
+batch jobs can use it directly, or through the command line:
+
+    python -m expense_core --help
+"""
+from .analytics import (
+    downsample_cumulative, filter_transactions, income_expense_over_time, lttb_indices, transaction_page,
+)
+from .charts import CHART_MAX_POINTS, cumulative_chart, expense_pie_chart, render_cumulative_chart, render_expense_pie
+from .ingest import (
+    UploadCache, describe_rejections, migrate_workbook, read_csv_transactions, read_transactions_file,
+    validate_transactions,
+)
+from .reports import (
+    ExportJob, ExportJobs, export_to_csv, export_to_excel, export_to_parquet, export_to_pdf,
+)
+from .schema import CATEGORIES, TRANSACTION_COLUMNS, TRANSACTION_TYPES, format_money, to_cents
+from .store import (
+    DB_PATH, DEFAULT_LEDGER, LedgerIndex, LedgerRegistry, LedgerSnapshot, SQLiteLedger,
+    TransactionJournal, TransactionStore, ledger_db_path,
+)
+
+__all__ = [
+    'CATEGORIES', 'TRANSACTION_COLUMNS', 'TRANSACTION_TYPES', 'format_money', 'to_cents',
+    'DB_PATH', 'DEFAULT_LEDGER', 'LedgerIndex', 'LedgerRegistry', 'LedgerSnapshot', 'SQLiteLedger',
+    'TransactionJournal', 'TransactionStore', 'ledger_db_path',
+    'downsample_cumulative', 'filter_transactions', 'income_expense_over_time', 'lttb_indices',
+    'transaction_page',
+    'UploadCache', 'describe_rejections', 'migrate_workbook', 'read_csv_transactions',
+    'read_transactions_file', 'validate_transactions',
+    'CHART_MAX_POINTS', 'cumulative_chart', 'expense_pie_chart', 'render_cumulative_chart', 'render_expense_pie',
+    'ExportJob', 'ExportJobs', 'export_to_csv', 'export_to_excel', 'export_to_parquet', 'export_to_pdf',
+]
@@ -0,0 +1,94 @@
+"""Filtering, paging, income/expense aggregations and chart downsampling."""
+import numpy as np
+import pandas as pd
+
+def filter_transactions(df, transaction_type=None, categories=None, search=None):
+    """Rows of `df` matching the history filters, in the same order"""
+    mask = np.ones(len(df), dtype=bool)
+    if transaction_type:
+        mask &= (df['Type'] == transaction_type).to_numpy()
+    if categories:
+        mask &= df['Category'].isin(categories).to_numpy()
+    if search:
+        mask &= df['Description'].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+    return df if mask.all() else df[mask]
+
+def transaction_page(df, page, page_size):
+    """Rows on a 1-based page of `df`"""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+def income_expense_over_time(df):
+    """Build the daily and monthly income/expense tables in one vectorized pass.
+
+    Returns `(daily, monthly)`: `daily` has one row per date with Income,
+    Expense, their cumulative sums and the running Balance; `monthly` is
+    indexed by Month with Income, Expense and Balance columns. Amounts keep
+    the unit and dtype of `df['Amount']` (int64 cents for the store's frame).
+    """
+    # Split Amount into Income/Expense with masks instead of a row-wise apply
+    amounts = df['Amount'].to_numpy()
+    types = df['Type'].to_numpy(dtype=object)
+    split = pd.DataFrame({
+        'Income': np.where(types == 'Income', amounts, 0),
+        'Expense': np.where(types == 'Expense', amounts, 0),
+    }, index=pd.DatetimeIndex(df['Date'], name='Date'))
+    
+    # Daily totals come back sorted by date, ready for the cumulative sums
+    daily = split.groupby(level='Date').sum()
+    daily['Cumulative_Income'] = daily['Income'].cumsum()
+    daily['Cumulative_Expense'] = daily['Expense'].cumsum()
+    daily['Balance'] = daily['Cumulative_Income'] - daily['Cumulative_Expense']
+    
+    # Monthly totals are rolled up from the (much smaller) daily table
+    monthly = daily[['Income', 'Expense']].groupby(daily.index.to_period('M')).sum()
+    monthly.index.name = 'Month'
+    monthly['Balance'] = monthly['Income'] - monthly['Expense']
+    
+    return daily.reset_index(), monthly
+
+def lttb_indices(x, y, max_points):
+    """Positions of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; the points between them are
+    split into `max_points - 2` buckets and from each bucket the point that
+    forms the largest triangle with the previously kept point and the mean of
+    the next bucket is kept. That preserves the visual shape of the series,
+    peaks and steps included, far better than taking every k-th point.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    kept = np.empty(max_points, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_hi = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        # Twice the triangle areas; only their order matters
+        areas = np.abs((x[previous] - next_x) * (y[lo:hi] - y[previous])
+                       - (x[previous] - x[lo:hi]) * (next_y - y[previous]))
+        previous = lo + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+def downsample_cumulative(daily, max_points, start=None, end=None):
+    """Rows of a daily totals table within [start, end], thinned for plotting.
+
+    Cumulative_Income and Cumulative_Expense are each reduced to `max_points`
+    dates with LTTB and the union of the kept dates is returned, so the result
+    has at most `2 * max_points` rows whatever the date span. Narrowing the
+    range therefore brings back finer detail.
+    """
+    dates = daily['Date']
+    window = daily[(dates >= pd.Timestamp(start or dates.min())) & (dates <= pd.Timestamp(end or dates.max()))]
+    x = window['Date'].to_numpy(dtype='datetime64[D]').astype('int64')
+    kept = np.union1d(
+        lttb_indices(x, window['Cumulative_Income'].to_numpy(), max_points),
+        lttb_indices(x, window['Cumulative_Expense'].to_numpy(), max_points),
+    )
+    return window.iloc[kept]
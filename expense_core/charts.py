@@ -0,0 +1,107 @@
+"""Charts: interactive Vega-Lite charts for the app, matplotlib PNGs for reports.
+
+altair, matplotlib and seaborn are imported inside the functions that use
+them, so code that draws no chart never loads them.
+"""
+import io
+
+# Most dates per series the cumulative chart plots; longer spans are downsampled
+CHART_MAX_POINTS = 500
+
+# Line colours shared by the interactive and the PNG cumulative charts
+INCOME_COLOR = '#00cc96'
+EXPENSE_COLOR = '#ef553b'
+
+def expense_pie_chart(category_totals):
+    """Interactive donut chart of expense totals in cents by category"""
+    import altair as alt
+    
+    data = (category_totals / 100).rename('Amount').rename_axis('Category').reset_index()
+    data['Share'] = data['Amount'] / data['Amount'].sum()
+    return alt.Chart(data).mark_arc(innerRadius=50).encode(
+        theta=alt.Theta('Amount:Q', stack=True),
+        color=alt.Color('Category:N', legend=alt.Legend(title=None)),
+        tooltip=['Category:N', alt.Tooltip('Amount:Q', format=',.2f'), alt.Tooltip('Share:Q', format='.1%')],
+    )
+
+def cumulative_chart(points):
+    """Interactive cumulative income vs expenses lines from (downsampled) daily totals in cents"""
+    import altair as alt
+    
+    data = points[['Date', 'Cumulative_Income', 'Cumulative_Expense']].rename(columns={
+        'Cumulative_Income': 'Cumulative Income', 'Cumulative_Expense': 'Cumulative Expenses'
+    }).melt('Date', var_name='Series', value_name='Amount')
+    data['Amount'] /= 100
+    return alt.Chart(data).mark_line(point=len(points) <= 60).encode(
+        x=alt.X('Date:T', title='Date'),
+        y=alt.Y('Amount:Q', title='Amount (RM)'),
+        color=alt.Color('Series:N', legend=alt.Legend(title=None, orient='bottom'), scale=alt.Scale(
+            domain=['Cumulative Income', 'Cumulative Expenses'], range=[INCOME_COLOR, EXPENSE_COLOR]
+        )),
+        tooltip=[alt.Tooltip('Date:T', format='%Y-%m-%d'), 'Series:N', alt.Tooltip('Amount:Q', format=',.2f')],
+    )
+
+def figure_to_png(fig):
+    """Render a figure to PNG bytes and close it"""
+    import matplotlib.pyplot as plt
+    
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+def chart_style(theme):
+    """Matplotlib style matching the app theme"""
+    import matplotlib.pyplot as plt
+    
+    return plt.style.context('dark_background' if theme == 'dark' else 'default')
+
+def render_expense_pie(category_totals, theme):
+    """Pie chart of expense totals by category as PNG bytes"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    with chart_style(theme):
+        fig, ax = plt.subplots(figsize=(8, 6))
+        colors = sns.color_palette('pastel')
+        wedges, texts, autotexts = ax.pie(
+            category_totals.values, 
+            labels=category_totals.index, 
+            autopct='%1.1f%%',
+            colors=colors
+        )
+        
+        for autotext in autotexts:
+            autotext.set_color('black')
+            autotext.set_fontsize(10)
+        
+        ax.set_title('Expense Distribution by Category', fontsize=14, fontweight='bold')
+        return figure_to_png(fig)
+
+def render_cumulative_chart(daily_totals, theme):
+    """Cumulative income vs expenses line chart (from totals in cents) as PNG bytes"""
+    import matplotlib.pyplot as plt
+    
+    with chart_style(theme):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        
+        # Plot cumulative income and expenses
+        ax.plot(daily_totals['Date'], daily_totals['Cumulative_Income'] / 100, 
+                marker='o', linewidth=2, markersize=4, color=INCOME_COLOR, label='Cumulative Income')
+        ax.plot(daily_totals['Date'], daily_totals['Cumulative_Expense'] / 100, 
+                marker='s', linewidth=2, markersize=4, color=EXPENSE_COLOR, label='Cumulative Expenses')
+        
+        # Customize the plot
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Amount (RM)')
+        ax.set_title('Income vs Expenses Over Time', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        
+        # Format x-axis dates
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
+        
+        return figure_to_png(fig)
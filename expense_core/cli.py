@@ -0,0 +1,114 @@
+"""Command line entry point for headless ingest and report runs.
+
+    python -m expense_core ingest ledger.xlsx [--ledger household] [--replace]
+    python -m expense_core report --excel report.xlsx --pdf report.pdf [--ledger household]
+    python -m expense_core report --input ledger.xlsx --pdf report.pdf --pdf-scope summary
+
+`ingest` adds the transactions from exported workbooks (or CSV/Parquet
+files) to a ledger database; `report` writes the Excel/PDF/CSV/Parquet
+exports of a ledger, or of input files directly without touching a database.
+"""
+import argparse
+import os
+import sys
+
+from .ingest import describe_rejections, read_transactions_file
+from .reports import export_to_csv, export_to_excel, export_to_parquet, export_to_pdf
+from .store import DB_PATH, DEFAULT_LEDGER, SQLiteLedger, TransactionStore, ledger_db_path
+
+PDF_SCOPES = ['all', 'recent', 'summary']
+
+def open_ledger(args):
+    """TransactionStore for the ledger named on the command line"""
+    if not args.db:
+        raise SystemExit("No database: pass --db or set EXPENSE_TRACKER_DB")
+    return TransactionStore(SQLiteLedger(ledger_db_path(args.ledger, args.db)))
+
+def read_inputs(paths, store, skip_duplicates=False):
+    """Add every input file to `store`, reporting what was read or skipped"""
+    for path in paths:
+        df, rejected = read_transactions_file(path, os.path.basename(path))
+        added = store.extend(df, skip_duplicates=skip_duplicates)
+        message = f"{path}: {added:,} transactions"
+        if added < len(df):
+            message += f", skipped {len(df) - added:,} already in the ledger"
+        if rejected:
+            message += f", skipped {sum(rejected.values()):,} invalid rows ({describe_rejections(rejected)})"
+        print(message)
+
+def ingest(args):
+    store = open_ledger(args)
+    if args.replace:
+        store.clear()
+    read_inputs(args.files, store, args.skip_duplicates)
+    print(f"Ledger '{args.ledger}' now holds {len(store):,} transactions")
+    store.backend.close()
+
+def report(args):
+    if args.input:
+        store = TransactionStore()
+        read_inputs(args.input, store)
+    else:
+        store = open_ledger(args)
+    if not len(store):
+        raise SystemExit("No transactions to report on")
+
+    outputs = [
+        (args.excel, lambda: export_to_excel(store, month_sheets=args.month_sheets)),
+        (args.pdf, lambda: export_to_pdf(
+            store, args.pdf_scope, args.months, args.group_by_month, charts=args.pdf_charts
+        )),
+        (args.csv, lambda: export_to_csv(store)),
+        (args.parquet, lambda: export_to_parquet(store)),
+    ]
+    for path, export in outputs:
+        if path:
+            with open(path, 'wb') as f:
+                f.write(export().getvalue())
+            print(f"Wrote {path}")
+    if store.backend is not None:
+        store.backend.close()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m expense_core', description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_ledger_options(subparser):
+        subparser.add_argument('--db', default=DB_PATH,
+                               help="database of the default ledger (default: EXPENSE_TRACKER_DB or %(default)s)")
+        subparser.add_argument('--ledger', default=DEFAULT_LEDGER, help="ledger name (default: %(default)s)")
+
+    ingest_parser = subparsers.add_parser('ingest', help="import transaction files into a ledger")
+    ingest_parser.add_argument('files', nargs='+', help=".xlsx, .csv or .parquet files")
+    ingest_parser.add_argument('--replace', action='store_true', help="delete the ledger's transactions first")
+    ingest_parser.add_argument('--skip-duplicates', action='store_true',
+                               help="leave out rows already in the ledger, e.g. from an overlapping export")
+    add_ledger_options(ingest_parser)
+    ingest_parser.set_defaults(run=ingest)
+
+    report_parser = subparsers.add_parser('report', help="write reports for a ledger or input files")
+    report_parser.add_argument('--input', nargs='+', help="report on these files instead of a ledger")
+    report_parser.add_argument('--excel', help="write the Excel workbook here")
+    report_parser.add_argument('--month-sheets', action='store_true', help="add a workbook sheet per month")
+    report_parser.add_argument('--pdf', help="write the PDF report here")
+    report_parser.add_argument('--csv', help="write a CSV export here")
+    report_parser.add_argument('--parquet', help="write a Parquet export here")
+    report_parser.add_argument('--pdf-scope', choices=PDF_SCOPES, default='all')
+    report_parser.add_argument('--months', type=int, default=12, help="months covered by --pdf-scope recent")
+    report_parser.add_argument('--group-by-month', action='store_true', help="list PDF transactions per month")
+    report_parser.add_argument('--pdf-charts', action='store_true',
+                               help="add the expense pie and cumulative chart to the PDF (needs matplotlib)")
+    add_ledger_options(report_parser)
+    report_parser.set_defaults(run=report)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'report' and not any([args.excel, args.pdf, args.csv, args.parquet]):
+        raise SystemExit("Nothing to write: pass at least one of --excel, --pdf, --csv or --parquet")
+    try:
+        args.run(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,178 @@
+"""Reading, validating and migrating transaction files."""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .schema import CATEGORIES, TRANSACTION_COLUMNS, TRANSACTION_TYPES
+from .store import DB_PATH, SQLiteLedger, TransactionStore
+
+# Rows parsed per chunk when streaming a CSV import
+CSV_CHUNK_ROWS = 50_000
+
+# Column types the file readers parse as. Date and Amount are left to
+# validate_transactions so bad values are counted as rejections, not raised.
+READ_DTYPES = {'Category': str, 'Description': str, 'Type': str}
+
+# Parsed uploads kept in memory across all sessions, in bytes of DataFrame
+UPLOAD_CACHE_BYTES = 256 * 1024 * 1024
+
+def validate_transactions(df):
+    """Coerce a DataFrame to the transaction schema in one vectorized pass.
+
+    Returns `(valid, rejected)`: the rows that passed, with typed columns, and
+    a dict mapping each rejection reason to its row count. Each rejected row
+    is counted once, under the first check it fails. Raises ValueError if a
+    required column is missing.
+    """
+    missing = [col for col in TRANSACTION_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    
+    # Transactions are kept by day, as the database and the exports store them
+    dates = pd.to_datetime(df['Date'], errors='coerce').dt.normalize()
+    amounts = pd.to_numeric(df['Amount'], errors='coerce').astype('float64')
+    types = df['Type'].astype(str).str.strip().str.title()
+    
+    checks = {
+        'invalid date': dates.isna(),
+        'invalid amount': ~np.isfinite(amounts),
+        'invalid type': ~types.isin(TRANSACTION_TYPES),
+        'missing category': df['Category'].isna(),
+    }
+    rejected = {}
+    failed = np.zeros(len(df), dtype=bool)
+    for reason, check in checks.items():
+        new_failures = check.to_numpy() & ~failed
+        if new_failures.any():
+            rejected[reason] = int(new_failures.sum())
+        failed |= new_failures
+    
+    keep = ~failed
+    valid = pd.DataFrame({
+        'Date': dates[keep],
+        'Category': df['Category'][keep].astype(str),
+        'Description': df['Description'][keep].fillna('').astype(str),
+        'Amount': amounts[keep],
+        'Type': types[keep],
+    })
+    return valid, rejected
+
+def describe_rejections(rejected):
+    """One-line summary of the rejection counts from validate_transactions"""
+    return ", ".join(f"{count} {reason}" for reason, count in rejected.items())
+
+def read_csv_transactions(source, chunksize=CSV_CHUNK_ROWS):
+    """Stream a CSV file in chunks, validating each chunk as it is read.
+
+    Only the transaction columns are parsed and the valid rows are kept with
+    categorical Category/Type, so memory stays bounded by one raw chunk plus
+    the compact result. Returns `(valid, rejected)` like validate_transactions.
+    """
+    chunks = []
+    rejected = {}
+    categories = pd.Index(CATEGORIES)
+    type_dtype = pd.CategoricalDtype(TRANSACTION_TYPES)
+    
+    for chunk in pd.read_csv(source, usecols=lambda col: col in TRANSACTION_COLUMNS, dtype=READ_DTYPES,
+                             chunksize=chunksize):
+        valid, chunk_rejected = validate_transactions(chunk)
+        for reason, count in chunk_rejected.items():
+            rejected[reason] = rejected.get(reason, 0) + count
+        categories = categories.append(pd.Index(valid['Category'].unique()).difference(categories))
+        chunks.append(valid.astype({'Category': pd.CategoricalDtype(categories), 'Type': type_dtype}))
+    
+    if not chunks:
+        return validate_transactions(pd.DataFrame(columns=TRANSACTION_COLUMNS))
+    
+    # Earlier chunks saw fewer categories; align them so the result stays categorical
+    category_dtype = pd.CategoricalDtype(categories)
+    return pd.concat([chunk.astype({'Category': category_dtype}) for chunk in chunks], ignore_index=True), rejected
+
+def read_transactions_file(source, name):
+    """Read and validate transactions from an .xlsx, .csv or .parquet file.
+
+    Returns `(valid, rejected)`. Raises ValueError for unsupported file types
+    or missing columns.
+    """
+    if name.endswith('.xlsx'):
+        # Ledgers past Excel's row limit continue on 'Transactions (2)', 'Transactions (3)', ...
+        with pd.ExcelFile(source) as workbook:
+            if 'Transactions' not in workbook.sheet_names:
+                raise ValueError("The workbook has no 'Transactions' sheet")
+            sheets = [sheet for sheet in workbook.sheet_names
+                      if sheet == 'Transactions' or re.fullmatch(r'Transactions \(\d+\)', sheet)]
+            return validate_transactions(pd.concat([
+                workbook.parse(sheet, usecols=lambda col: col in TRANSACTION_COLUMNS, dtype=READ_DTYPES)
+                for sheet in sheets
+            ], ignore_index=True))
+    if name.endswith('.csv'):
+        return read_csv_transactions(source)
+    if name.endswith('.parquet'):
+        return validate_transactions(pd.read_parquet(source, columns=TRANSACTION_COLUMNS))
+    raise ValueError("Please upload an Excel (.xlsx), CSV (.csv) or Parquet (.parquet) file")
+
+class UploadCache:
+    """Parsed, validated upload files keyed on their content, safe to share between sessions.
+
+    Re-reading a file whose bytes were seen before returns the cached frame
+    instead of parsing it again. Entries are evicted least recently used
+    first once the cached frames take more than `max_bytes`. The frames are
+    shared, so callers must not modify them in place.
+    """
+
+    def __init__(self, max_bytes=UPLOAD_CACHE_BYTES):
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, data, name):
+        """Parse the file bytes `data` named `name` like read_transactions_file.
+
+        Returns `(valid, rejected, parse_seconds, cached)`, where
+        `parse_seconds` is the time the original parse took.
+        """
+        key = (hashlib.sha256(data).hexdigest(), os.path.splitext(name)[1].lower())
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                valid, rejected, seconds, _ = self._entries[key]
+                return valid, dict(rejected), seconds, True
+        
+        start = time.perf_counter()
+        valid, rejected = read_transactions_file(io.BytesIO(data), name)
+        seconds = time.perf_counter() - start
+        size = int(valid.memory_usage(deep=True).sum())
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = (valid, rejected, seconds, size)
+                self._bytes += size
+            # Always keep the newest entry, even if it alone is over the limit
+            while self._bytes > self._max_bytes and len(self._entries) > 1:
+                *_, evicted_size = self._entries.popitem(last=False)[1]
+                self._bytes -= evicted_size
+        return valid, dict(rejected), seconds, False
+
+def migrate_workbook(source, db_path=DB_PATH):
+    """Import an exported workbook (or CSV/Parquet file) into the database.
+
+    Returns `(added, rejected)`: the number of transactions imported and the
+    rejection counts from validate_transactions.
+    """
+    name = source if isinstance(source, str) else source.name
+    df, rejected = read_transactions_file(source, name)
+    store = TransactionStore(SQLiteLedger(db_path))
+    store.extend(df)
+    store.backend.close()
+    return len(df), rejected
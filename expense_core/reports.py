@@ -0,0 +1,383 @@
+"""Excel, PDF, CSV and Parquet exports and the background export runner.
+
+Every export takes a `source`: a TransactionStore, or a LedgerSnapshot when
+it runs on another thread. xlsxwriter and reportlab are imported only when a
+workbook or PDF is built.
+"""
+import io
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .analytics import downsample_cumulative
+from .charts import CHART_MAX_POINTS, render_cumulative_chart, render_expense_pie
+from .schema import TRANSACTION_COLUMNS, format_money
+
+# Finished export files kept in memory across all sessions
+EXPORT_CACHE_SIZE = 8
+
+# Excel limits: data rows per sheet (below the header), serial number of
+# 1970-01-01 and nanoseconds per day for converting dates to serials
+EXCEL_MAX_DATA_ROWS = 1_048_575
+EXCEL_EPOCH_SERIAL = 25569
+EXCEL_NS_PER_DAY = 86_400 * 10**9
+# Rows converted to Python values at a time while streaming a sheet
+EXCEL_CHUNK_ROWS = 50_000
+# Ledgers larger than this are written in xlsxwriter's constant-memory mode.
+# It stores strings inline, which makes the workbook about twice as slow to
+# read back, so smaller ledgers keep the shared string table.
+EXCEL_CONSTANT_MEMORY_ROWS = 50_000
+
+# PDF report layout: rows per table chunk (about one page), page cap, column widths in points
+PDF_ROWS_PER_TABLE = 30
+PDF_MAX_PAGES = 500
+PDF_DESCRIPTION_CHARS = 35
+PDF_COL_WIDTHS = [65, 95, 168, 75, 65]
+PDF_SUMMARY_COL_WIDTHS = [90, 120, 120, 120]
+# Embedded chart sizes in points (the matplotlib figures are 8x6 and 10x6 inches)
+PDF_PIE_SIZE = (360, 270)
+PDF_CUMULATIVE_SIZE = (450, 270)
+
+def excel_rows(df):
+    """(date serial, category, description, amount, type) per row, converted a chunk at a time"""
+    for start in range(0, len(df), EXCEL_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXCEL_CHUNK_ROWS]
+        dates = chunk['Date'].to_numpy(dtype='datetime64[ns]').astype('int64') / EXCEL_NS_PER_DAY
+        yield from zip(
+            (dates + EXCEL_EPOCH_SERIAL).tolist(),
+            chunk['Category'].astype(str).tolist(),
+            chunk['Description'].fillna('').astype(str).tolist(),
+            (chunk['Amount'].to_numpy() / 100).tolist(),
+            chunk['Type'].astype(str).tolist(),
+        )
+
+def write_transactions_sheet(workbook, name, df, formats):
+    """Stream `df` row by row into new worksheets, starting at `name`.
+
+    Rows past Excel's sheet limit continue on "<name> (2)", "<name> (3)", ...
+    Amounts are written in currency units and dates as Excel serial numbers.
+    """
+    rows = excel_rows(df)
+    for sheet_number in range(1, max(-(-len(df) // EXCEL_MAX_DATA_ROWS), 1) + 1):
+        worksheet = workbook.add_worksheet(name if sheet_number == 1 else f"{name} ({sheet_number})")
+        worksheet.set_column(0, 0, 11)
+        worksheet.set_column(2, 2, 30)
+        worksheet.write_row(0, 0, TRANSACTION_COLUMNS, formats['header'])
+        for row, (date, category, description, amount, transaction_type) in enumerate(
+            itertools.islice(rows, EXCEL_MAX_DATA_ROWS), 1
+        ):
+            worksheet.write_number(row, 0, date, formats['date'])
+            worksheet.write_string(row, 1, category)
+            worksheet.write_string(row, 2, description)
+            worksheet.write_number(row, 3, amount)
+            worksheet.write_string(row, 4, transaction_type)
+
+def export_to_excel(source, progress=None, month_sheets=False):
+    """Export transactions to Excel format.
+
+    Rows are written straight from the store with xlsxwriter, in
+    constant-memory mode past EXCEL_CONSTANT_MEMORY_ROWS so that peak memory
+    stops growing with the ledger. The Summary sheet comes from the running totals and the monthly rollup. With
+    `month_sheets`, each month's transactions also get a sheet of their own.
+    `progress(fraction, message)`, if given, is called as the file is built.
+    Returns a BytesIO, or None when there are no transactions.
+    """
+    import xlsxwriter
+    
+    progress = progress or (lambda fraction, message: None)
+    if not len(source):
+        return None
+    
+    df = source.frame
+    output = io.BytesIO()
+    # constant_memory flushes each finished row, so every sheet is written top to bottom
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': len(df) > EXCEL_CONSTANT_MEMORY_ROWS})
+    formats = {
+        'header': workbook.add_format({'bold': True, 'border': 1, 'align': 'center'}),
+        'date': workbook.add_format({'num_format': 'yyyy-mm-dd'}),
+        'money': workbook.add_format({'num_format': '#,##0.00'}),
+    }
+    
+    progress(0.0, "Writing transactions")
+    write_transactions_sheet(workbook, 'Transactions', df, formats)
+    
+    # Summary sheet: the totals, then the monthly rollup below them
+    progress(0.5, "Writing summary")
+    summary = workbook.add_worksheet('Summary')
+    summary.set_column(0, 0, 15)
+    summary.set_column(1, 3, 14)
+    summary.write_row(0, 0, ['Metric', 'Amount'], formats['header'])
+    for row, (metric, cents) in enumerate(zip(['Total Income', 'Total Expenses', 'Balance'], source.totals), 1):
+        summary.write_string(row, 0, metric)
+        summary.write_number(row, 1, cents / 100, formats['money'])
+    monthly = source.monthly_summary()
+    summary.write_row(5, 0, ['Month'] + list(monthly.columns), formats['header'])
+    for row, (month, *amounts) in enumerate(monthly.itertuples(), 6):
+        summary.write_string(row, 0, str(month))
+        for col, cents in enumerate(amounts, 1):
+            summary.write_number(row, col, cents / 100, formats['money'])
+    
+    if month_sheets:
+        months = df.groupby(df['Date'].dt.to_period('M'), sort=True).indices
+        for done, (month, positions) in enumerate(months.items()):
+            progress(0.5 + 0.4 * done / len(months), f"Writing {month}")
+            month_df = df.iloc[positions].sort_values('Date', kind='stable')
+            write_transactions_sheet(workbook, str(month), month_df, formats)
+    
+    progress(0.9, "Compressing workbook")
+    workbook.close()
+    progress(1.0, "Done")
+    output.seek(0)
+    return output
+
+def pdf_tables(rows, col_widths, style):
+    """Split header + body rows into page-sized tables that each repeat the header"""
+    from reportlab.platypus import Table
+    
+    header, body = rows[0], rows[1:]
+    return [
+        Table([header] + body[start:start + PDF_ROWS_PER_TABLE], colWidths=col_widths, repeatRows=1, style=style)
+        for start in range(0, max(len(body), 1), PDF_ROWS_PER_TABLE)
+    ]
+
+def pdf_transaction_rows(df):
+    """Header + formatted rows of the transactions table"""
+    return [TRANSACTION_COLUMNS] + [list(row) for row in zip(
+        df['Date'].dt.strftime('%Y-%m-%d'),
+        df['Category'].astype(str),
+        df['Description'].astype(str).str.slice(0, PDF_DESCRIPTION_CHARS),
+        [format_money(cents, '') for cents in df['Amount']],
+        df['Type'].astype(str)
+    )]
+
+def pdf_charts(source):
+    """The expense pie and cumulative chart as PDF images, drawn with matplotlib"""
+    from reportlab.platypus import Image
+    
+    images = []
+    expenses = source.category_totals('Expense')
+    if len(expenses):
+        images.append(Image(io.BytesIO(render_expense_pie(expenses, 'light')), *PDF_PIE_SIZE))
+    points = downsample_cumulative(source.daily_totals(), CHART_MAX_POINTS)
+    images.append(Image(io.BytesIO(render_cumulative_chart(points, 'light')), *PDF_CUMULATIVE_SIZE))
+    return images
+
+def export_to_pdf(source, scope='all', months=12, group_by_month=False, progress=None, charts=False):
+    """Export transactions to PDF format.
+
+    `scope` is 'all' for every transaction, 'recent' for the last `months`
+    months, or 'summary' for the totals and monthly summary only. With
+    `group_by_month` the transactions are listed per month with subtotals,
+    and with `charts` the expense pie and the cumulative chart follow the
+    totals.
+    Tables are split into page-sized chunks with repeating headers, and at
+    most PDF_MAX_PAGES pages of transactions are written. `progress` works
+    as in export_to_excel.
+    """
+    progress = progress or (lambda fraction, message: None)
+    if not len(source):
+        return None
+    
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+    
+    # Create PDF in memory
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+    progress(0.0, "Preparing tables")
+    
+    # reportlab reports how many flowables it has laid out so far
+    layout = {'total': 1}
+    def on_layout(kind, value):
+        if kind == 'SIZE_EST':
+            layout['total'] = max(value, 1)
+        elif kind == 'PROGRESS':
+            progress(0.1 + 0.9 * min(value / layout['total'], 1.0), "Laying out pages")
+    doc.setProgressCallBack(on_layout)
+    
+    # Title
+    title = Paragraph("Expense Tracker Report", styles['Title'])
+    elements.append(title)
+    elements.append(Spacer(1, 12))
+    
+    # Summary
+    total_income, total_expenses, balance = source.totals
+    summary_text = (f"Total Income: {format_money(total_income, '$')} | "
+                    f"Total Expenses: {format_money(total_expenses, '$')} | Balance: {format_money(balance, '$')}")
+    summary = Paragraph(summary_text, styles['Normal'])
+    elements.append(summary)
+    elements.append(Spacer(1, 20))
+    
+    if charts:
+        progress(0.0, "Drawing charts")
+        elements.extend(pdf_charts(source))
+        elements.append(Spacer(1, 20))
+    
+    # One style object shared by every chunk of every table
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    
+    if scope == 'summary':
+        elements.append(Paragraph("Monthly Summary", styles['Heading2']))
+        monthly_rows = [['Month', 'Income', 'Expense', 'Balance']] + [
+            [str(month), format_money(income, ''), format_money(expense, ''), format_money(month_balance, '')]
+            for month, income, expense, month_balance in source.monthly_summary().itertuples()
+        ]
+        elements.extend(pdf_tables(monthly_rows, PDF_SUMMARY_COL_WIDTHS, table_style))
+        doc.build(elements)
+        progress(1.0, "Done")
+        buffer.seek(0)
+        return buffer
+    
+    df = source.frame
+    if scope == 'recent':
+        first_month = df['Date'].max().to_period('M') - (months - 1)
+        df = df[df['Date'] >= first_month.to_timestamp()]
+        elements.append(Paragraph(f"Transactions from the last {months} months", styles['Heading2']))
+    
+    # Cap the page count; keep the most recent transactions
+    max_rows = PDF_MAX_PAGES * PDF_ROWS_PER_TABLE
+    if len(df) > max_rows:
+        df = df.sort_values('Date', kind='stable').iloc[-max_rows:]
+        elements.append(Paragraph(
+            f"Showing the most recent {max_rows:,} transactions. Export to Excel or CSV for the full ledger.",
+            styles['Italic']
+        ))
+    
+    # Transactions tables (without ID)
+    if group_by_month:
+        for month, month_df in df.groupby(df['Date'].dt.to_period('M'), sort=True):
+            elements.append(Paragraph(month.strftime('%B %Y'), styles['Heading2']))
+            elements.extend(pdf_tables(pdf_transaction_rows(month_df), PDF_COL_WIDTHS, table_style))
+            income = month_df.loc[month_df['Type'] == 'Income', 'Amount'].sum()
+            expense = month_df.loc[month_df['Type'] == 'Expense', 'Amount'].sum()
+            elements.append(Paragraph(
+                f"Subtotal: Income {format_money(income, '$')} | Expenses {format_money(expense, '$')} | "
+                f"Net {format_money(income - expense, '$')}",
+                styles['Normal']
+            ))
+            elements.append(Spacer(1, 12))
+    else:
+        elements.extend(pdf_tables(pdf_transaction_rows(df), PDF_COL_WIDTHS, table_style))
+    
+    doc.build(elements)
+    progress(1.0, "Done")
+    buffer.seek(0)
+    return buffer
+
+def export_to_csv(source):
+    """Export transactions to CSV format"""
+    if not len(source):
+        return None
+    
+    output = io.BytesIO()
+    df = source.frame
+    df.assign(Amount=df['Amount'] / 100).to_csv(output, index=False, date_format='%Y-%m-%d')
+    output.seek(0)
+    return output
+
+def export_to_parquet(source):
+    """Export transactions to Parquet format"""
+    if not len(source):
+        return None
+    
+    output = io.BytesIO()
+    df = source.frame
+    df.assign(Amount=df['Amount'] / 100).to_parquet(output, index=False)
+    output.seek(0)
+    return output
+
+class ExportJob:
+    """One background export build and its progress"""
+
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.message = "Queued"
+        self.future = None
+
+    def update(self, fraction, message):
+        self.progress = fraction
+        self.message = message
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def error(self):
+        return self.future.exception() if self.done else None
+
+    @property
+    def result(self):
+        """Finished file bytes"""
+        return self.future.result().getvalue()
+
+class ExportJobs:
+    """Builds export files on a thread pool and keeps the finished ones.
+
+    Jobs are keyed on (kind, store uid, data version, options), so asking
+    again for an export of unchanged data returns the existing job and its
+    cached bytes instead of rebuilding. At most EXPORT_CACHE_SIZE jobs are
+    kept; the least recently used finished ones are evicted first.
+    """
+
+    builders = {
+        'excel': lambda snapshot, progress, month_sheets=False: export_to_excel(snapshot, progress, month_sheets),
+        'pdf': lambda snapshot, progress, scope, months, grouped, charts=False: export_to_pdf(
+            snapshot, scope, months, grouped, progress, charts
+        ),
+        'csv': lambda snapshot, progress: export_to_csv(snapshot),
+        'parquet': lambda snapshot, progress: export_to_parquet(snapshot),
+    }
+
+    def __init__(self, max_workers=2, max_jobs=EXPORT_CACHE_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._jobs = OrderedDict()
+        self._max_jobs = max_jobs
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_key(kind, store, options=()):
+        return (kind, store.uid, store.version, tuple(options))
+
+    def get(self, kind, store, options=()):
+        """The job for this export of the store's current data, if one was started"""
+        key = self.job_key(kind, store, options)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, kind, store, options=()):
+        """Start building an export of the store's current data (or reuse an existing job)"""
+        snapshot = store.snapshot()
+        key = self.job_key(kind, snapshot, options)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.error is None:
+                self._jobs.move_to_end(key)
+                return job
+            
+            job = ExportJob(key)
+            job.future = self._executor.submit(self.builders[kind], snapshot, job.update, *options)
+            self._jobs[key] = job
+            
+            # Evict the oldest finished jobs past the limit
+            for old_key in [k for k, j in self._jobs.items() if j.done][:max(len(self._jobs) - self._max_jobs, 0)]:
+                del self._jobs[old_key]
+        return job
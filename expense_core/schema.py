@@ -0,0 +1,42 @@
+"""Transaction schema and money helpers shared by the whole package."""
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+
+# Transaction schema shared by the store, the upload validation and the exports
+TRANSACTION_COLUMNS = ['Date', 'Category', 'Description', 'Amount', 'Type']
+TRANSACTION_TYPES = ['Income', 'Expense']
+CATEGORIES = [
+    "Fund", "Food & Dining", "Transportation", "Shopping", 
+    "Entertainment", "Bills & Utilities", "Healthcare",
+    "Education", "Travel", "Salary", "Freelance", 
+    "Investments", "Other"
+]
+
+# Largest amount in cents that a float64 with two decimals converts to exactly
+# (about 11 trillion in currency units); past it the float's own rounding
+# error can reach half a cent
+MAX_EXACT_FLOAT_CENTS = 2 ** 50
+
+def to_cents(amounts):
+    """Convert amounts in currency units (floats, ints, Decimals or numeric strings) to int64 cents.
+
+    Amounts are expected to have at most two decimals, as entered in the form
+    or exported by this app; anything finer is rounded half to even. Float
+    arrays are converted in float64, which is exact up to
+    MAX_EXACT_FLOAT_CENTS; Decimals, strings and other object arrays are
+    converted with Decimal arithmetic, exact over the whole int64 range.
+    """
+    amounts = np.asarray(amounts)
+    if amounts.dtype.kind in 'iu':
+        return amounts.astype('int64') * 100
+    if amounts.dtype.kind in 'OU':
+        cents = [int((Decimal(str(amount)) * 100).to_integral_value(ROUND_HALF_EVEN)) for amount in amounts.flat]
+        return np.array(cents, dtype='int64').reshape(amounts.shape)
+    return np.rint(amounts.astype('float64') * 100).astype('int64')
+
+def format_money(cents, currency='RM'):
+    """Format an amount in cents exactly, e.g. 123456 -> 'RM1,234.56', -1750 -> 'RM-17.50'"""
+    sign = '-' if cents < 0 else ''
+    whole, fraction = divmod(abs(int(cents)), 100)
+    return f"{currency}{sign}{whole:,}.{fraction:02d}"
@@ -0,0 +1,1135 @@
+"""Transaction storage: the in-memory store, its indexes and the SQLite ledger."""
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .analytics import income_expense_over_time
+from .schema import CATEGORIES, TRANSACTION_COLUMNS, TRANSACTION_TYPES, to_cents
+
+# SQLite database holding the ledger between sessions (empty string disables persistence)
+DB_PATH = os.environ.get('EXPENSE_TRACKER_DB', 'expense_tracker.db')
+
+# Ledger a new session attaches to; other named ledgers live next to DB_PATH
+DEFAULT_LEDGER = 'default'
+LEDGER_NAME_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{0,63}')
+
+# Share of the stored rows that may be tombstoned before a background compaction drops them
+COMPACT_RATIO = 0.1
+
+# Edits the undo history keeps, and rows all of its undo and redo steps may
+# refer to together; deleted rows only forgotten edits could bring back are
+# dropped by the next compaction
+UNDO_DEPTH = 100
+UNDO_MAX_ROWS = 500_000
+
+# Journal entries since the last compaction that trigger another one, which
+# rebases the journal so replaying it stays short
+JOURNAL_MAX_ENTRIES = 1_000
+
+class SQLiteLedger:
+    """Durable transaction storage in a local SQLite database.
+
+    The database runs in WAL mode with indexes on date, type and category.
+    Inserts and deletes are written in batches, one transaction per call, and
+    the totals a store starts from are computed in SQL as integer sums over
+    the amount in cents.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    amount_cents INTEGER NOT NULL,
+                    type TEXT NOT NULL
+                )
+            """)
+            self._migrate()
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions (type)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (category)")
+            # The ID counter lives here so IDs are not reused across restarts
+            self._conn.execute("CREATE TABLE IF NOT EXISTS ledger_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _migrate(self):
+        """Upgrade databases written by older versions of the app"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")]
+        if 'amount' in columns:
+            # Version 0 stored REAL amounts in currency units
+            self._conn.execute("ALTER TABLE transactions RENAME TO transactions_v0")
+            self._conn.execute("""
+                CREATE TABLE transactions (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    amount_cents INTEGER NOT NULL,
+                    type TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                INSERT INTO transactions
+                SELECT id, date, category, description, CAST(ROUND(amount * 100) AS INTEGER), type
+                FROM transactions_v0
+            """)
+            self._conn.execute("DROP TABLE transactions_v0")
+        if version < self.SCHEMA_VERSION:
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    @property
+    def next_id(self):
+        """First transaction ID that has never been used"""
+        row = self._conn.execute("SELECT value FROM ledger_meta WHERE key = 'next_id'").fetchone()
+        return row[0] if row else 0
+
+    def load(self):
+        """All stored transactions as an id-indexed DataFrame"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT id, date AS Date, category AS Category, description AS Description, "
+                "amount_cents AS Amount, type AS Type FROM transactions ORDER BY id",
+                self._conn, index_col='id', parse_dates=['Date']
+            )
+        return df
+
+    def insert_rows(self, rows, next_id):
+        """Insert (id, date, category, description, amount_cents, type) tuples in one transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ledger_meta (key, value) VALUES ('next_id', ?)", (int(next_id),)
+            )
+
+    def insert_frame(self, df, next_id):
+        """Insert an id-indexed, typed transactions frame in one transaction"""
+        rows = zip(
+            df.index.tolist(),
+            df['Date'].dt.strftime('%Y-%m-%d'),
+            df['Category'].astype(str),
+            df['Description'].astype(str),
+            df['Amount'].tolist(),
+            df['Type'].astype(str)
+        )
+        self.insert_rows(rows, next_id)
+
+    def delete(self, ids):
+        """Delete transactions by ID in one transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM transactions WHERE id = ?", ((int(i),) for i in ids))
+
+    def clear(self):
+        """Delete all transactions (the ID counter is kept)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+
+    def totals(self):
+        """(income, expenses, balance) in cents"""
+        with self._lock:
+            income, expense = self._conn.execute("""
+                SELECT COALESCE(SUM(CASE WHEN type = 'Income' THEN amount_cents END), 0),
+                       COALESCE(SUM(CASE WHEN type = 'Expense' THEN amount_cents END), 0)
+                FROM transactions
+            """).fetchone()
+        return income, expense, income - expense
+
+    def close(self):
+        self._conn.close()
+
+class LedgerIndex:
+    """Secondary indexes over the rows of a TransactionStore, keyed by transaction ID.
+
+    Sorted dates, the IDs and sums of each (type, category) group, daily and
+    monthly rollups and row content hashes, so lookups cost O(log n + k) and
+    summaries O(periods) instead of a scan of the ledger. IDs are used rather
+    than positions because they never change when other rows are removed.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._dates = np.array([], dtype='datetime64[ns]')
+        self._date_ids = np.array([], dtype='int64')
+        self._groups = {}
+        self._sums = {}
+        self._counts = {}
+        self._daily = {}
+        self._monthly = {}
+        self._hashes = np.array([], dtype='uint64')
+        self._dead_ids = np.array([], dtype='int64')
+        self._dead_hashes = np.array([], dtype='uint64')
+
+    def __len__(self):
+        return len(self._date_ids) - len(self._dead_ids)
+
+    def add(self, chunk, newest=True):
+        """Index the live rows of an id-indexed chunk.
+
+        With `newest` the chunk's IDs must all be newer than the indexed ones,
+        which keeps insertion cheap; otherwise (rows brought back after a
+        compaction) the date order is rebuilt with a full sort.
+        """
+        if not len(chunk):
+            return
+        ids = chunk.index.to_numpy(dtype='int64')
+        dates = chunk['Date'].to_numpy(dtype='datetime64[ns]')
+        if newest:
+            order = np.argsort(dates, kind='stable')
+            # New IDs are the largest, so inserting after equal dates keeps ties in ID order
+            positions = np.searchsorted(self._dates, dates[order], side='right')
+            self._dates = np.insert(self._dates, positions, dates[order])
+            self._date_ids = np.insert(self._date_ids, positions, ids[order])
+        else:
+            dates = np.concatenate([self._dates, dates])
+            date_ids = np.concatenate([self._date_ids, ids])
+            order = np.lexsort((date_ids, dates))
+            self._dates = dates[order]
+            self._date_ids = date_ids[order]
+
+        for key, rows in self._group_rows(chunk).items():
+            group = np.concatenate([self._groups.get(key, self._date_ids[:0]), ids[rows]])
+            self._groups[key] = group if newest else np.sort(group)
+        self._count_in(chunk, 1)
+
+        hashes = np.sort(self.row_hashes(chunk))
+        self._hashes = np.insert(self._hashes, np.searchsorted(self._hashes, hashes), hashes)
+
+    def kill(self, chunk):
+        """Tombstone the indexed rows of an id-indexed chunk.
+
+        Their amounts leave the sums and rollups, and their IDs and hashes
+        are recorded as dead for lookups to filter out, so the cost grows with
+        the number of tombstones rather than with the ledger.
+        """
+        if not len(chunk):
+            return
+        self._dead_ids = np.sort(np.concatenate([self._dead_ids, chunk.index.to_numpy(dtype='int64')]))
+        self._dead_hashes = np.sort(np.concatenate([self._dead_hashes, self.row_hashes(chunk)]))
+        self._count_in(chunk, -1)
+
+    def revive(self, chunk):
+        """Bring back tombstoned rows of an id-indexed chunk"""
+        if not len(chunk):
+            return
+        self._dead_ids = self._dead_ids[~np.isin(self._dead_ids, chunk.index.to_numpy(dtype='int64'))]
+        self._dead_hashes = self._without(self._dead_hashes, self.row_hashes(chunk))
+        self._count_in(chunk, 1)
+
+    def purge(self, chunk):
+        """Drop the tombstoned rows of an id-indexed chunk from the arrays for good, when the store compacts"""
+        if not len(chunk):
+            return
+        ids = chunk.index.to_numpy(dtype='int64')
+        keep = ~np.isin(self._date_ids, ids)
+        self._dates = self._dates[keep]
+        self._date_ids = self._date_ids[keep]
+
+        for key, rows in self._group_rows(chunk).items():
+            remaining = self._groups[key][~np.isin(self._groups[key], ids[rows])]
+            if len(remaining):
+                self._groups[key] = remaining
+            else:
+                del self._groups[key]
+
+        hashes = self.row_hashes(chunk)
+        self._hashes = self._without(self._hashes, hashes)
+        self._dead_ids = self._dead_ids[~np.isin(self._dead_ids, ids)]
+        self._dead_hashes = self._without(self._dead_hashes, hashes)
+
+    def _count_in(self, chunk, sign):
+        """Add (sign 1) or subtract (sign -1) a chunk's rows in the group sums and counts and the rollups"""
+        amounts = chunk['Amount'].to_numpy(dtype='int64')
+        for key, rows in self._group_rows(chunk).items():
+            count = self._counts.get(key, 0) + sign * len(rows)
+            if count:
+                self._counts[key] = count
+                self._sums[key] = self._sums.get(key, 0) + sign * int(amounts[rows].sum())
+            else:
+                del self._counts[key], self._sums[key]
+        self._roll_up(chunk, sign)
+
+    @staticmethod
+    def _without(values, removed):
+        """Sorted `values` with one occurrence of each element of `removed` taken out"""
+        if not len(removed):
+            return values
+        removed, counts = np.unique(removed, return_counts=True)
+        starts = np.searchsorted(values, removed)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.delete(values, np.repeat(starts, counts) + offsets)
+
+    def _live(self, ids):
+        """`ids` without the tombstoned ones"""
+        if not len(self._dead_ids):
+            return ids
+        return ids[~np.isin(ids, self._dead_ids)]
+
+    @property
+    def hashes(self):
+        """Sorted content hashes of the live rows"""
+        return self._without(self._hashes, self._dead_hashes)
+
+    def _roll_up(self, chunk, sign):
+        """Add (sign 1) or subtract (sign -1) a chunk's amounts in the daily and monthly rollups.
+
+        Each rollup maps a period number (days or months since 1970) to
+        [income, expense, row count]; a period whose last row is removed is
+        dropped.
+        """
+        days = chunk['Date'].to_numpy(dtype='datetime64[D]')
+        types = chunk['Type'].to_numpy(dtype=object)
+        amounts = chunk['Amount'].to_numpy(dtype='int64')
+        income = np.where(types == 'Income', amounts, 0)
+        expense = np.where(types == 'Expense', amounts, 0)
+        for rollup, periods in ((self._daily, days), (self._monthly, days.astype('datetime64[M]'))):
+            # Sort by period and sum each run of equal periods, keeping the
+            # cents in int64 (bincount would go through float64 weights)
+            order = np.argsort(periods, kind='stable')
+            periods = periods.view('int64')[order]
+            starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+            keys = periods[starts]
+            incomes = np.add.reduceat(income[order], starts)
+            expenses = np.add.reduceat(expense[order], starts)
+            counts = np.diff(np.r_[starts, len(periods)])
+            for period, period_income, period_expense, count in zip(
+                keys.tolist(), incomes.tolist(), expenses.tolist(), counts.tolist()
+            ):
+                row = rollup.setdefault(period, [0, 0, 0])
+                row[0] += sign * period_income
+                row[1] += sign * period_expense
+                row[2] += sign * count
+                if not row[2]:
+                    del rollup[period]
+
+    @staticmethod
+    def row_hashes(chunk):
+        """64-bit hash of each row's transaction columns (a missing Description hashes as '')"""
+        columns = chunk[TRANSACTION_COLUMNS].assign(Description=chunk['Description'].fillna(''))
+        return pd.util.hash_pandas_object(columns, index=False).to_numpy()
+
+    def duplicates(self, chunk):
+        """Mask of the chunk rows that are already indexed, honouring occurrence counts.
+
+        A row that occurs k times in the chunk and m times in the index has
+        its first min(k, m) occurrences flagged, so repeated but genuine rows
+        (two identical coffees on one day) are only matched once each. A hash
+        collision between different rows is possible but vanishingly unlikely
+        at 64 bits.
+        """
+        hashes = self.row_hashes(chunk)
+        stored = (np.searchsorted(self._hashes, hashes, side='right')
+                  - np.searchsorted(self._hashes, hashes, side='left')
+                  - np.searchsorted(self._dead_hashes, hashes, side='right')
+                  + np.searchsorted(self._dead_hashes, hashes, side='left'))
+        occurrence = pd.Series(hashes).groupby(hashes, sort=False).cumcount().to_numpy()
+        return occurrence < stored
+
+    @staticmethod
+    def _group_rows(chunk):
+        """{(type, category): row positions in chunk}"""
+        return chunk.groupby(['Type', 'Category'], observed=True, sort=False).indices
+
+    @property
+    def date_range(self):
+        """(earliest, latest) indexed date, or None when empty"""
+        if not len(self):
+            return None
+        first = self._first_live(self._date_ids)
+        last = len(self._date_ids) - 1 - self._first_live(self._date_ids[::-1])
+        return pd.Timestamp(self._dates[first]), pd.Timestamp(self._dates[last])
+
+    def _first_live(self, ids):
+        """Position of the first live ID in `ids`, checked in doubling blocks so only the dead ones ahead are read"""
+        if not len(self._dead_ids):
+            return 0
+        start, size = 0, 16
+        while True:
+            block = ids[start:start + size]
+            dead = self._dead_ids[np.minimum(np.searchsorted(self._dead_ids, block), len(self._dead_ids) - 1)]
+            live = np.flatnonzero(dead != block)
+            if len(live):
+                return start + int(live[0])
+            start += size
+            size *= 2
+
+    def ids_between(self, start, end):
+        """IDs of rows dated within [start, end], in date order"""
+        lo = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        return self._live(self._date_ids[lo:hi])
+
+    def ids_by_date(self):
+        """All IDs ordered by date, ties in ID order"""
+        return self._live(self._date_ids)
+
+    def ids_for(self, transaction_type=None, categories=None):
+        """Ascending IDs of the rows with that type and one of those categories"""
+        arrays = [
+            ids for (group_type, category), ids in self._groups.items()
+            if (not transaction_type or group_type == transaction_type)
+            and (not categories or category in categories)
+        ]
+        if not arrays:
+            return self._date_ids[:0]
+        return self._live(arrays[0] if len(arrays) == 1 else np.sort(np.concatenate(arrays)))
+
+    def category_totals(self, transaction_type):
+        """Sum of amounts in cents per category for one transaction type"""
+        totals = {category: total for (group_type, category), total in self._sums.items()
+                  if group_type == transaction_type}
+        return pd.Series(dict(sorted(totals.items())), name='Amount', dtype='int64').rename_axis('Category')
+
+    @staticmethod
+    def _rollup_frame(rollup, unit, name):
+        """Income/Expense columns of a rollup in period order, indexed by period start"""
+        periods = sorted(rollup)
+        values = np.array([rollup[period][:2] for period in periods], dtype='int64').reshape(-1, 2)
+        starts = np.array(periods, dtype='int64').view(f'datetime64[{unit}]').astype('datetime64[ns]')
+        return pd.DataFrame(values, columns=['Income', 'Expense'], index=pd.DatetimeIndex(starts, name=name))
+
+    def monthly_summary(self):
+        """Income, Expense and Balance in cents per month, indexed by Month"""
+        monthly = self._rollup_frame(self._monthly, 'M', 'Month')
+        monthly.index = monthly.index.to_period('M')
+        monthly['Balance'] = monthly['Income'] - monthly['Expense']
+        return monthly
+
+    def daily_totals(self):
+        """Income, Expense, their cumulative sums and the running Balance in cents per date"""
+        daily = self._rollup_frame(self._daily, 'D', 'Date')
+        daily['Cumulative_Income'] = daily['Income'].cumsum()
+        daily['Cumulative_Expense'] = daily['Expense'].cumsum()
+        daily['Balance'] = daily['Cumulative_Income'] - daily['Cumulative_Expense']
+        return daily.reset_index()
+
+class TransactionJournal:
+    """Log of the mutations of a TransactionStore since its base, with bounded undo and redo per session.
+
+    Each entry is an (action, ids, next_id, origin, session) tuple: 'add' or
+    'delete', the IDs of the transactions it affected, the ID counter after
+    it, whether it was a new 'edit', an 'undo' or a 'redo', and the session
+    that made it (None outside the app). Entries only hold IDs; the rows
+    themselves stay in the store. Undoing an edit logs its inverse and
+    redoing it logs it again, so replaying the entries in order on top of
+    the base (the IDs stored, the ID counter and the undo history when the
+    journal was last rebased) rebuilds the same ledger (see
+    TransactionStore.replay).
+
+    Every session has its own undo and redo stacks of edits, so sessions
+    sharing a ledger only undo their own changes; a new edit clears the
+    session's redo stack. Undo and redo only reach rows no other session has
+    changed since: a change takes its rows out of the other sessions' steps,
+    and steps left without rows are dropped. An undo stack keeps the session's last UNDO_DEPTH
+    edits, and the oldest steps of any session are forgotten while all the
+    stacks refer to more than UNDO_MAX_ROWS rows. `released` counts the
+    deleted rows no step refers to any more since the last rebase.
+    """
+
+    def __init__(self):
+        # session -> [(edit number, entry)], most recent last
+        self._undo = {}
+        self._redo = {}
+        self._edits = 0
+        self.rebase([], 0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _copy(stacks):
+        return {session: list(stack) for session, stack in stacks.items()}
+
+    def rebase(self, ids, next_id):
+        """Start the log afresh from a ledger holding `ids`, keeping the undo history"""
+        self.entries = []
+        self.base_ids = np.asarray(ids, dtype='int64')
+        self.base_next_id = int(next_id)
+        self._base_history = self._copy(self._undo), self._copy(self._redo), self._edits
+        self.released = 0
+
+    def at_base(self):
+        """A journal with this one's base and the undo history it had there, and no entries"""
+        journal = TransactionJournal()
+        undo, redo, journal._edits = self._base_history
+        journal._undo, journal._redo = self._copy(undo), self._copy(redo)
+        journal.rebase(self.base_ids, self.base_next_id)
+        return journal
+
+    def log(self, action, ids, next_id, origin='edit', session=None):
+        """Append an entry and move it, or the edit it undoes or redoes, between the session's stacks.
+
+        An undo or redo logs the IDs it actually changed, and the edit moves
+        to the other stack with only those, or is dropped if there were none.
+        """
+        entry = (action, np.asarray(ids, dtype='int64'), int(next_id), origin, session)
+        self.entries.append(entry)
+        undo = self._undo.setdefault(session, [])
+        redo = self._redo.setdefault(session, [])
+        if origin == 'edit':
+            self._edits += 1
+            undo.append((self._edits, entry))
+            # Undone adds that can no longer be redone
+            self.released += sum(len(edit[1]) for _, edit in redo if edit[0] == 'add')
+            redo.clear()
+            self._forget(session)
+        else:
+            source, target = (undo, redo) if origin == 'undo' else (redo, undo)
+            number, edit = source.pop()
+            if len(entry[1]):
+                target.append((number, (edit[0], entry[1]) + edit[2:]))
+        # New rows are in no other session's steps
+        if origin != 'edit' or action != 'add':
+            self._disown(session, entry[1])
+
+    def _disown(self, session, ids):
+        """Take `ids` out of the other sessions' steps, dropping the steps left without rows"""
+        if not len(ids):
+            return
+        for stacks in (self._undo, self._redo):
+            for other, stack in stacks.items():
+                if other == session:
+                    continue
+                steps = []
+                for number, edit in stack:
+                    kept = edit[1][~np.isin(edit[1], ids)]
+                    if len(kept):
+                        steps.append((number, edit if len(kept) == len(edit[1]) else (edit[0], kept) + edit[2:]))
+                stack[:] = steps
+
+    def _forget(self, session):
+        """Drop the session's edits past UNDO_DEPTH, then the oldest steps of any session past UNDO_MAX_ROWS.
+
+        Only edits grow the stacks (undo and redo move an edit between a
+        session's two stacks), so checking after each edit keeps them within
+        bounds. An undo stack loses its oldest edit and a redo stack its
+        newest, so the rest can still be undone and redone in order. The
+        edit just made is always kept.
+        """
+        undo = self._undo[session]
+        while len(undo) > UNDO_DEPTH:
+            self._drop(undo, 'delete')
+        held = sum(len(edit[1]) for stacks in (self._undo, self._redo) for stack in stacks.values()
+                   for _, edit in stack)
+        while held > UNDO_MAX_ROWS:
+            ends = [(stack[0][0], released, stack) for released, stacks in (('delete', self._undo), ('add', self._redo))
+                    for stack in stacks.values() if stack]
+            number, released, stack = min(ends, key=lambda end: end[0])
+            if number == self._edits:
+                break
+            held -= self._drop(stack, released)
+
+    def _drop(self, stack, released):
+        """Forget the bottom step of a stack, releasing its rows if it was a `released` action; return its size"""
+        _, (action, ids, _, _, _) = stack.pop(0)
+        if action == released:
+            self.released += len(ids)
+        return len(ids)
+
+    def undo_entry(self, session=None):
+        """The edit the session's next undo reverts, or None"""
+        stack = self._undo.get(session)
+        return stack[-1][1] if stack else None
+
+    def redo_entry(self, session=None):
+        """The edit the session's next redo applies again, or None"""
+        stack = self._redo.get(session)
+        return stack[-1][1] if stack else None
+
+    @property
+    def stacks(self):
+        """{session: (undo, redo)} with edits as (number, action, ID list, next_id) tuples, most recent last"""
+        sessions = {session for stacks in (self._undo, self._redo) for session, stack in stacks.items() if stack}
+        return {
+            session: tuple([(number, action, ids.tolist(), next_id) for number, (action, ids, next_id, _, _)
+                            in stacks.get(session, [])] for stacks in (self._undo, self._redo))
+            for session in sessions
+        }
+
+    def held_ids(self):
+        """IDs of the rows the undo and redo stacks refer to"""
+        ids = [edit[1] for stacks in (self._undo, self._redo) for stack in stacks.values() for _, edit in stack]
+        return np.unique(np.concatenate(ids)) if ids else np.array([], dtype='int64')
+
+class TransactionStore:
+    """Columnar storage for all transactions, shared by the sessions attached to one ledger.
+
+    Rows live in a single typed DataFrame indexed by transaction ID, with
+    Amount in integer cents so every total is an exact sum; `frame` exposes
+    the live rows and a LedgerIndex answers range, selection and summary
+    queries. With a `backend` (an SQLiteLedger) the store loads its rows from
+    it and writes every mutation through to it first. `version` is bumped by
+    every mutation; with `uid` it identifies one state of the data for caches
+    of derived output such as charts.
+    """
+
+    # Recompute the running totals after every mutation and raise if they drifted
+    # (also on with EXPENSE_TRACKER_CHECK_TOTALS=1)
+    check_totals = os.environ.get('EXPENSE_TRACKER_CHECK_TOTALS') == '1'
+
+    def __init__(self, backend=None):
+        self._frame = self._empty_frame()
+        self._tombstones = np.zeros(0, dtype=bool)
+        self._dead = 0
+        self._live_frame = None
+        self._archive = self._empty_frame()
+        self._compaction_scheduled = False
+        self.journal = TransactionJournal()
+        self._pending = []
+        self._next_id = 0
+        self._income = 0
+        self._expense = 0
+        self._index = LedgerIndex()
+        # Held by mutations and by reads that touch more than one attribute, so
+        # Streamlit script threads see each mutation completely or not at all
+        self._lock = threading.RLock()
+        self.uid = uuid.uuid4().hex
+        self.version = 0
+        self.backend = backend
+        if backend is not None:
+            self._load_from_backend()
+
+    def _load_from_backend(self):
+        """Replace the in-memory state with the backend's rows and totals"""
+        self._frame = self._concat_to(self._empty_frame(), self._coerce(self.backend.load(), cents=True))
+        self._tombstones = np.zeros(len(self._frame), dtype=bool)
+        self._index.add(self._frame)
+        self._next_id = self.backend.next_id
+        self._income, self._expense, _ = self.backend.totals()
+        self.journal.rebase(self._frame.index, self._next_id)
+
+    @staticmethod
+    def _empty_frame():
+        return pd.DataFrame({
+            'Date': pd.Series(dtype='datetime64[ns]'),
+            'Category': pd.Series(pd.Categorical([], categories=CATEGORIES)),
+            'Description': pd.Series(dtype='object'),
+            'Amount': pd.Series(dtype='int64'),
+            'Type': pd.Series(pd.Categorical([], categories=TRANSACTION_TYPES)),
+        }, index=pd.Index([], dtype='int64', name='id'))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frame) - self._dead + len(self._pending)
+
+    @property
+    def frame(self):
+        """All transactions in insertion order (shared, do not modify in place)"""
+        with self._lock:
+            self._fold_pending()
+            if not self._dead:
+                return self._frame
+            if self._live_frame is None:
+                self._live_frame = self._frame[~self._tombstones]
+            return self._live_frame
+
+    def _fold_pending(self):
+        """Move the buffered single appends into the frame and the index"""
+        if self._pending:
+            pending = pd.DataFrame(self._pending, columns=['id'] + TRANSACTION_COLUMNS)
+            self._pending = []
+            self._add_rows(self._coerce(pending.set_index('id'), cents=True))
+
+    @property
+    def date_range(self):
+        """(earliest, latest) transaction date, or None when empty"""
+        with self._lock:
+            self._fold_pending()  # index buffered rows
+            return self._index.date_range
+
+    def ids_for(self, transaction_type=None, categories=None):
+        """Ascending IDs of the rows with that type and one of those categories"""
+        with self._lock:
+            self._fold_pending()
+            return self._index.ids_for(transaction_type, categories)
+
+    def select(self, transaction_type=None, categories=None):
+        """Rows with that type and one of those categories, in insertion order"""
+        with self._lock:
+            if not transaction_type and not categories:
+                return self.frame
+            return self.frame.loc[self.ids_for(transaction_type, categories)]
+
+    def by_date(self, ascending=True, transaction_type=None, categories=None):
+        """Rows with that type and one of those categories, all by default, ordered by date.
+
+        Ties are in insertion order when ascending. A selection is looked up
+        in the index, so only the selected rows are sorted.
+        """
+        with self._lock:
+            if transaction_type or categories:
+                selected = self.select(transaction_type, categories)
+                order = np.lexsort((selected.index.to_numpy(), selected['Date'].to_numpy()))
+                return selected.iloc[order if ascending else order[::-1]]
+            frame = self.frame
+            ids = self._index.ids_by_date()
+            return frame.loc[ids if ascending else ids[::-1]]
+
+    @property
+    def totals(self):
+        """Running (income, expenses, balance) in cents, kept up to date by every mutation"""
+        with self._lock:
+            return self._income, self._expense, self._income - self._expense
+
+    @property
+    def last_id(self):
+        """ID of the most recently added transaction still stored"""
+        with self._lock:
+            if self._pending:
+                return self._pending[-1][0]
+            live = np.flatnonzero(~self._tombstones)
+            return self._frame.index[live[-1]] if len(live) else None
+
+    def snapshot(self):
+        """Read-only view of the current data version"""
+        with self._lock:
+            return LedgerSnapshot(self)
+
+    def _allocate_ids(self, count):
+        """Reserve a block of fresh transaction IDs"""
+        ids = np.arange(self._next_id, self._next_id + count, dtype='int64')
+        self._next_id += count
+        return ids
+
+    def append(self, date, category, description, amount, transaction_type, session=None):
+        """Buffer a single transaction (Amount in currency units) and return its ID.
+
+        IDs come from a counter and are never reused. The row is folded into
+        the frame on the next read, so adding one never rebuilds the frame.
+        """
+        with self._lock:
+            transaction_id = int(self._allocate_ids(1)[0])
+            cents = int(to_cents([amount])[0])
+            if self.backend is not None:
+                self.backend.insert_rows([(
+                    transaction_id, pd.Timestamp(date).strftime('%Y-%m-%d'), str(category),
+                    str(description), cents, str(transaction_type)
+                )], next_id=self._next_id)
+            self._pending.append((transaction_id, date, category, description, cents, transaction_type))
+            self._add_to_totals([transaction_type], [cents])
+            self.version += 1
+            self._log('add', [transaction_id], session=session)
+            return transaction_id
+
+    def extend(self, df, skip_duplicates=False, session=None):
+        """Append the rows of a DataFrame holding the transaction columns (Amount in currency units).
+
+        With `skip_duplicates`, rows already in the ledger are left out (see
+        LedgerIndex.duplicates). Returns the number of rows appended.
+        """
+        with self._lock:
+            self._fold_pending()  # so insertion order is kept
+            chunk = self._coerce(df[TRANSACTION_COLUMNS])
+            if skip_duplicates:
+                chunk = chunk[~self._index.duplicates(chunk)]
+            if not len(chunk):
+                return 0
+            chunk = chunk.set_axis(pd.Index(self._allocate_ids(len(chunk)), name='id'), axis=0)
+            self._insert(chunk)
+            self._log('add', chunk.index, session=session)
+            return len(chunk)
+
+    def _insert(self, chunk):
+        """Store a coerced chunk of new rows, whose IDs are all newer than the stored ones"""
+        if self.backend is not None:
+            self.backend.insert_frame(chunk, next_id=self._next_id)
+        self._add_rows(chunk)
+        self._add_to_totals(chunk['Type'], chunk['Amount'])
+        self.version += 1
+
+    def _add_rows(self, chunk):
+        """Append live rows with new IDs to the frame and the index"""
+        self._frame = self._concat_to(self._frame, chunk)
+        self._tombstones = np.concatenate([self._tombstones, np.zeros(len(chunk), dtype=bool)])
+        self._live_frame = None
+        self._index.add(chunk)
+
+    def find_duplicates(self, df):
+        """Mask of the DataFrame rows (Amount in currency units) already in the ledger"""
+        with self._lock:
+            self._fold_pending()
+            return self._index.duplicates(self._coerce(df[TRANSACTION_COLUMNS]))
+
+    def delete(self, ids, session=None):
+        """Remove the transactions with the given IDs in one pass; return how many were removed.
+
+        Rows are tombstoned in place rather than dropped, and `frame` filters
+        them out once per data version. Once they pass COMPACT_RATIO of the
+        rows, a background thread compacts them away.
+        """
+        with self._lock:
+            self._fold_pending()
+            removed = self._kill(ids)
+            if len(removed):
+                self._log('delete', removed, session=session)
+            return len(removed)
+
+    def delete_where(self, predicate, session=None):
+        """Remove the transactions for which `predicate(frame)` is True; return how many were removed"""
+        with self._lock:
+            frame = self.frame
+            mask = np.asarray(predicate(frame), dtype=bool)
+            return self.delete(frame.index[mask], session)
+
+    def delete_between(self, start, end, session=None):
+        """Remove the transactions dated within [start, end]; return how many were removed"""
+        with self._lock:
+            self._fold_pending()
+            return self.delete(self._index.ids_between(start, end), session)
+
+    def clear(self, session=None):
+        """Remove all transactions (IDs keep counting up)"""
+        with self._lock:
+            self._fold_pending()
+            if self.backend is not None:
+                self.backend.clear()
+            removed = self._kill(self._frame.index, write_through=False)
+            if len(removed):
+                self._log('delete', removed, session=session)
+
+    def undo(self, session=None):
+        """Revert the session's latest edit not yet undone; return it with the IDs changed, or None if none were.
+
+        Every mutation is logged in the journal with the session that made it.
+        Undo tombstones the rows an edit added or brings back the ones it
+        deleted, from the archive once compacted, so no copy of the ledger is
+        kept per step.
+        """
+        with self._lock:
+            entry = self.journal.undo_entry(session)
+            if entry is None:
+                return None
+            action, ids, _, _, _ = entry
+            self._fold_pending()
+            changed = self._kill(ids) if action == 'add' else self._revive(ids)
+            self._log('delete' if action == 'add' else 'add', changed, 'undo', session)
+            return (action, changed) + entry[2:] if len(changed) else None
+
+    def redo(self, session=None):
+        """Apply the session's latest undone edit again; return it with the IDs changed, or None if none were"""
+        with self._lock:
+            entry = self.journal.redo_entry(session)
+            if entry is None:
+                return None
+            action, ids, _, _, _ = entry
+            self._fold_pending()
+            changed = self._revive(ids) if action == 'add' else self._kill(ids)
+            self._log(action, changed, 'redo', session)
+            return (action, changed) + entry[2:] if len(changed) else None
+
+    def _log(self, action, ids, origin='edit', session=None):
+        """Journal a mutation, compacting once the undo history released enough rows or the journal grew long"""
+        self.journal.log(action, ids, self._next_id, origin, session)
+        if self.journal.released > COMPACT_RATIO * len(self._frame) or len(self.journal) > JOURNAL_MAX_ENTRIES:
+            self._schedule_compaction()
+
+    def _kill(self, ids, write_through=True):
+        """Tombstone the live rows with the given IDs (buffered rows folded in); return their IDs"""
+        positions = self._frame.index.get_indexer(pd.Index(ids, dtype='int64').unique())
+        positions = positions[positions >= 0]
+        positions = np.sort(positions[~self._tombstones[positions]])
+        removed = self._frame.iloc[positions]
+        if not len(removed):
+            return removed.index.to_numpy()
+        if write_through and self.backend is not None:
+            self.backend.delete(removed.index)
+        self._tombstones[positions] = True
+        self._dead += len(removed)
+        self._live_frame = None
+        self._index.kill(removed)
+        self._add_to_totals(removed['Type'], -removed['Amount'])
+        self.version += 1
+        if self._dead > COMPACT_RATIO * len(self._frame):
+            self._schedule_compaction()
+        return removed.index.to_numpy()
+
+    def _schedule_compaction(self):
+        """Compact in a background thread unless a compaction is already pending"""
+        if not self._compaction_scheduled:
+            self._compaction_scheduled = True
+            threading.Thread(target=self.compact, name='ledger-compaction', daemon=True).start()
+
+    def _revive(self, ids):
+        """Bring back tombstoned or compacted-away rows with the given IDs; return the IDs brought back"""
+        ids = pd.Index(ids, dtype='int64').unique()
+        positions = self._frame.index.get_indexer(ids)
+        restored = self._archive.loc[ids[positions < 0]]
+        positions = positions[positions >= 0]
+        positions = np.sort(positions[self._tombstones[positions]])
+        revived = self._frame.iloc[positions]
+        if not len(revived) and not len(restored):
+            return ids[:0].to_numpy()
+        if self.backend is not None:
+            self.backend.insert_frame(self._concat_to(revived, restored), next_id=self._next_id)
+        if len(revived):
+            self._tombstones[positions] = False
+            self._dead -= len(revived)
+            self._index.revive(revived)
+        if len(restored):
+            # Compacted rows go back to their place in ID order
+            self._archive = self._archive.drop(restored.index)
+            frame = self._concat_to(self._frame, restored)
+            order = np.argsort(frame.index.to_numpy(), kind='stable')
+            self._frame = frame.iloc[order]
+            self._tombstones = np.concatenate([self._tombstones, np.zeros(len(restored), dtype=bool)])[order]
+            self._index.add(restored, newest=False)
+        self._live_frame = None
+        self._add_to_totals(
+            np.concatenate([revived['Type'].to_numpy(dtype=object), restored['Type'].to_numpy(dtype=object)]),
+            np.concatenate([revived['Amount'].to_numpy(), restored['Amount'].to_numpy()])
+        )
+        self.version += 1
+        return np.concatenate([revived.index.to_numpy(), restored.index.to_numpy()])
+
+    def compact(self):
+        """Drop tombstoned rows from the frame and the index and rebase the journal; return how many rows.
+
+        Dropped rows the undo history can still bring back move to the
+        archive. Archived rows it no longer refers to, because the edits that
+        deleted them were forgotten, are freed, which bounds the archive by
+        UNDO_MAX_ROWS plus the latest edit. The stored data does not change,
+        so `version` stays the same.
+        """
+        with self._lock:
+            self._compaction_scheduled = False
+            self._fold_pending()
+            removed = self._frame[self._tombstones]
+            if len(removed):
+                self._frame = self.frame
+                self._tombstones = np.zeros(len(self._frame), dtype=bool)
+                self._dead = 0
+                self._live_frame = None
+                self._index.purge(removed)
+            self.journal.rebase(self._frame.index, self._next_id)
+            archive = self._concat_to(self._archive, removed)
+            self._archive = archive[archive.index.isin(self.journal.held_ids())]
+            return len(removed)
+
+    def rows(self):
+        """Every row the store has held and may bring back, live or not, in ID order"""
+        with self._lock:
+            self._fold_pending()
+            return self._concat_to(self._frame, self._archive).sort_index(kind='stable')
+
+    @classmethod
+    def replay(cls, journal, rows):
+        """A new in-memory store with `journal`'s entries applied to its base.
+
+        `rows` supplies the content of every ID the journal and its undo
+        history refer to (see `rows()`). IDs at or past the ID counter are new
+        rows; consecutive new rows are inserted in one batch.
+        """
+        store = cls()
+        new_rows = []
+        # Held throughout, as a compaction may start in the background mid-replay
+        with store._lock:
+            store.journal = journal.at_base()
+            store._next_id = journal.base_next_id
+            store._insert(rows.loc[journal.base_ids])
+            # Rows deleted before the base, for the undo history to bring back
+            earlier = (rows.index < journal.base_next_id) & ~rows.index.isin(journal.base_ids)
+            store._archive = rows[earlier]
+            for action, ids, next_id, origin, session in journal.entries:
+                new = ids >= store._next_id if action == 'add' else np.zeros(len(ids), dtype=bool)
+                if not new.all() and new_rows:
+                    store._insert(rows.loc[np.concatenate(new_rows)])
+                    new_rows = []
+                if new.any():
+                    new_rows.append(ids[new])
+                if action == 'add' and not new.all():
+                    store._revive(ids[~new])
+                elif action == 'delete':
+                    store._kill(ids)
+                store._next_id = next_id
+                store.journal.log(action, ids, next_id, origin, session)
+            if new_rows:
+                store._insert(rows.loc[np.concatenate(new_rows)])
+        return store
+
+    def _add_to_totals(self, types, amounts):
+        """Fold signed amounts in cents into the running income/expense totals"""
+        types = np.asarray(types, dtype=object)
+        amounts = np.asarray(amounts, dtype='int64')
+        self._income += int(amounts[types == 'Income'].sum())
+        self._expense += int(amounts[types == 'Expense'].sum())
+        if self.check_totals:
+            self.verify_totals()
+
+    def category_totals(self, transaction_type='Expense'):
+        """Sum of amounts in cents per category for one transaction type"""
+        with self._lock:
+            self._fold_pending()
+            return self._index.category_totals(transaction_type)
+
+    def monthly_summary(self):
+        """Income, Expense and Balance in cents per month, indexed by Month"""
+        with self._lock:
+            self._fold_pending()
+            return self._index.monthly_summary()
+
+    def daily_totals(self):
+        """Per-date Income, Expense, cumulative sums and running Balance in cents"""
+        with self._lock:
+            self._fold_pending()
+            return self._index.daily_totals()
+
+    def recompute_totals(self):
+        """Full recompute of (income, expenses, balance) from the frame"""
+        frame = self.frame
+        income = int(frame.loc[frame['Type'] == 'Income', 'Amount'].sum())
+        expense = int(frame.loc[frame['Type'] == 'Expense', 'Amount'].sum())
+        return income, expense, income - expense
+
+    def verify_totals(self):
+        """Raise if the running totals or the monthly rollup drifted from a full recompute"""
+        for name, running, full in zip(('income', 'expense'), self.totals, self.recompute_totals()):
+            if running != full:
+                raise RuntimeError(f"Running {name} total {running!r} does not match recomputed {full!r}")
+        if not self.monthly_summary().equals(income_expense_over_time(self.frame)[1].astype('int64')):
+            raise RuntimeError("Monthly rollup does not match the recomputed monthly summary")
+        if not np.array_equal(self._index.hashes, np.sort(LedgerIndex.row_hashes(self.frame))):
+            raise RuntimeError("Row hash index does not match the stored rows")
+
+    def verify_journal(self):
+        """Raise if replaying the journal does not rebuild this store's ledger and undo history"""
+        with self._lock:
+            replayed = self.replay(self.journal, self.rows())
+            checks = {
+                'rows': replayed.frame.astype(self.frame.dtypes).equals(self.frame),
+                'ID counter': replayed._next_id == self._next_id,
+                'totals': replayed.totals == self.totals,
+                'date order': np.array_equal(replayed._index.ids_by_date(), self._index.ids_by_date()),
+                'monthly summary': replayed.monthly_summary().equals(self.monthly_summary()),
+                'daily totals': replayed.daily_totals().equals(self.daily_totals()),
+                'category totals': all(replayed.category_totals(kind).equals(self.category_totals(kind))
+                                       for kind in TRANSACTION_TYPES),
+                'row hashes': np.array_equal(replayed._index.hashes, self._index.hashes),
+                'undo history': replayed.journal.stacks == self.journal.stacks,
+            }
+        failed = [name for name, ok in checks.items() if not ok]
+        if failed:
+            raise RuntimeError(f"Replaying the journal does not rebuild the ledger's {', '.join(failed)}")
+
+    @staticmethod
+    def _coerce(chunk, cents=False):
+        """Coerce a chunk to the stored column types.
+
+        Amount is converted from currency units to cents unless `cents` says
+        it already is. Dates lose their time of day, which the database does
+        not keep.
+        """
+        chunk = chunk.astype({'Description': 'object'})
+        chunk['Amount'] = chunk['Amount'].astype('int64') if cents else to_cents(chunk['Amount'])
+        chunk['Date'] = pd.to_datetime(chunk['Date']).dt.normalize().astype('datetime64[ns]')
+        return chunk
+
+    @staticmethod
+    def _concat_to(frame, chunk):
+        """Append a coerced chunk to `frame`, returning the new frame"""
+        # Grow the categorical columns so both sides share one dtype and the
+        # concatenated columns stay categorical
+        dtypes = {}
+        for column in ('Category', 'Type'):
+            categories = frame[column].cat.categories
+            unseen = pd.Index(chunk[column].dropna().unique()).difference(categories)
+            dtypes[column] = pd.CategoricalDtype(categories.append(unseen))
+
+        return pd.concat([frame.astype(dtypes), chunk.astype(dtypes)])
+
+class LedgerSnapshot:
+    """Frozen view of a TransactionStore at one data version.
+
+    The store never modifies its frame in place, so a snapshot stays valid
+    after later mutations and can be read from another thread. It offers the
+    same read interface the exports use: `frame`, `totals`, `monthly_summary()`,
+    `daily_totals()`, `category_totals()` and `len()`. The rollups behind the
+    last three are copied from the store's index when the snapshot is taken.
+    """
+
+    def __init__(self, store):
+        self.frame = store.frame
+        self.totals = store.totals
+        self.uid = store.uid
+        self.version = store.version
+        self._monthly_summary = store.monthly_summary()
+        self._daily_totals = store.daily_totals()
+        self._category_totals = {kind: store.category_totals(kind) for kind in TRANSACTION_TYPES}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def monthly_summary(self):
+        """Income, Expense and Balance in cents per month, indexed by Month"""
+        return self._monthly_summary
+
+    def daily_totals(self):
+        """Per-date Income, Expense, cumulative sums and running Balance in cents"""
+        return self._daily_totals
+
+    def category_totals(self, transaction_type='Expense'):
+        """Sum of amounts in cents per category for one transaction type"""
+        return self._category_totals[transaction_type]
+
+def ledger_db_path(name, db_path=DB_PATH):
+    """Database file for a named ledger: DB_PATH itself for the default ledger,
+    `<stem>.<name><ext>` next to it for the others"""
+    if not LEDGER_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid ledger name {name!r}: use letters, digits, '-' and '_'")
+    if name == DEFAULT_LEDGER:
+        return db_path
+    stem, extension = os.path.splitext(db_path)
+    return f"{stem}.{name}{extension or '.db'}"
+
+class LedgerRegistry:
+    """Named ledgers shared by every session in the process.
+
+    Each ledger is loaded into one TransactionStore the first time a session
+    attaches to it, and every later session attaching by the same name gets
+    that same store, so memory grows with the number of ledgers rather than
+    the number of sessions. Without a database path the ledgers are kept in
+    memory only, for as long as the process runs.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def get(self, name=DEFAULT_LEDGER):
+        """The shared store for a ledger, loading or creating it on first use"""
+        path = ledger_db_path(name, self.db_path) if self.db_path else None
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = TransactionStore(SQLiteLedger(path) if path else None)
+                self._stores[name] = store
+            return store
+
+    def names(self):
+        """Ledgers that are open or have a database file, default first"""
+        with self._lock:
+            names = set(self._stores) | {DEFAULT_LEDGER}
+        if self.db_path:
+            stem, extension = os.path.splitext(self.db_path)
+            directory, prefix = os.path.split(stem + '.')
+            for file_name in os.listdir(directory or '.'):
+                name, found_extension = os.path.splitext(file_name[len(prefix):])
+                if (file_name.startswith(prefix) and found_extension == (extension or '.db')
+                        and LEDGER_NAME_PATTERN.fullmatch(name)):
+                    names.add(name)
+        return [DEFAULT_LEDGER] + sorted(names - {DEFAULT_LEDGER})
@@ -1,816 +1,1084 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
-import io
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-import warnings
-warnings.filterwarnings('ignore')
-
-# Set page configuration
-st.set_page_config(
-    page_title="Expense Tracker",
-    page_icon="💰",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Initialize session state for theme
-if 'theme' not in st.session_state:
-    st.session_state.theme = 'light'
-
-def toggle_theme():
-    """Toggle between light and dark theme"""
-    st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
-
-# Dark theme CSS (unchanged)
-dark_theme_css = """
-<style>
-    .main-header {
-        font-size: 3rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .stApp {
-        background-color: #0e1117;
-        color: #fafafa;
-    }
-    .metric-card {
-        background-color: #262730;
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 0.5rem 0;
-        border-left: 5px solid #1f77b4;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-    }
-    .income-card {
-        border-left: 5px solid #00cc96;
-    }
-    .expense-card {
-        border-left: 5px solid #ef553b;
-    }
-    .balance-card {
-        border-left: 5px solid #ffa15a;
-        background: linear-gradient(135deg, #262730 0%, #1c1c1c 100%);
-    }
-    .positive-balance {
-        color: #00cc96;
-        font-weight: bold;
-        font-size: 2.5rem;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-    }
-    .negative-balance {
-        color: #ef553b;
-        font-weight: bold;
-        font-size: 2.5rem;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-    }
-    .metric-title {
-        font-size: 1.2rem;
-        font-weight: 600;
-        color: #fafafa;
-        margin-bottom: 0.5rem;
-    }
-    .metric-value {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #fafafa;
-    }
-    /* Text colors for dark theme */
-    .stMarkdown, .stText, .stAlert, .stInfo, .stSuccess, .stWarning, .stError {
-        color: #fafafa !important;
-    }
-    /* Delete button styling */
-    .delete-btn {
-        background-color: #ff4444;
-        color: white;
-        border: none;
-        padding: 0.3rem 0.6rem;
-        border-radius: 5px;
-        cursor: pointer;
-        font-size: 0.8rem;
-    }
-    .delete-btn:hover {
-        background-color: #cc0000;
-    }
-    /* Transaction row styling */
-    .transaction-row {
-        border-bottom: 1px solid #444;
-        padding: 0.5rem 0;
-    }
-    /* Upload section styling */
-    .upload-section {
-        background-color: #1c1c1c;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 2px dashed #1f77b4;
-        margin: 1rem 0;
-        color: #fafafa !important;
-    }
-    .upload-section h4 {
-        color: #1f77b4 !important;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-    }
-    .upload-section p {
-        color: #fafafa !important;
-        margin-bottom: 0;
-        font-size: 0.95rem;
-        line-height: 1.4;
-    }
-    /* Sidebar styling */
-    .css-1d391kg, .css-1y4p8pa {
-        background-color: #262730;
-    }
-    /* Theme toggle button */
-    .theme-toggle {
-        background: linear-gradient(45deg, #1f77b4, #ff7f0e);
-        color: white;
-        border: none;
-        padding: 0.5rem 1rem;
-        border-radius: 25px;
-        font-weight: bold;
-        cursor: pointer;
-        margin: 1rem 0;
-    }
-    /* Fix for dataframes in dark mode */
-    .dataframe {
-        background-color: #262730 !important;
-        color: #fafafa !important;
-    }
-    .dataframe th {
-        background-color: #1f77b4 !important;
-        color: white !important;
-    }
-    .dataframe td {
-        background-color: #262730 !important;
-        color: #fafafa !important;
-        border-color: #444 !important;
-    }
-</style>
-"""
-
-# Apply the current theme
-if st.session_state.theme == 'light':
-    st.markdown("""
-    <style>
-        .main-header {
-            font-size: 3rem;
-            color: #ad7334;
-            text-align: center;
-            margin-bottom: 2rem;
-        }
-        .stApp {
-            background-color: #f9eee2;
-            color: #ad7334;
-        }
-        .metric-card {
-            background-color: #ffffff;
-            padding: 1.5rem;
-            border-radius: 15px;
-            margin: 0.5rem 0;
-            border-left: 5px solid #ad7334;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }
-        .income-card {
-            border-left: 5px solid #00cc96;
-        }
-        .expense-card {
-            border-left: 5px solid #ef553b;
-        }
-        .balance-card {
-            border-left: 5px solid #ffa15a;
-            background: linear-gradient(135deg, #fffaf0 0%, #f0f2f6 100%);
-        }
-        .positive-balance {
-            color: #00cc96;
-            font-weight: bold;
-            font-size: 2.5rem;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        }
-        .negative-balance {
-            color: #ef553b;
-            font-weight: bold;
-            font-size: 2.5rem;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        }
-        .metric-title {
-            font-size: 1.2rem;
-            font-weight: 600;
-            color: #ad7334;
-            margin-bottom: 0.5rem;
-        }
-        .metric-value {
-            font-size: 2.5rem;
-            font-weight: 700;
-            color: #2c3e50;
-        }
-        /* Main page text colors */
-        .main .stMarkdown, 
-        .main .stText, 
-        .main .stAlert, 
-        .main .stInfo, 
-        .main .stSuccess, 
-        .main .stWarning, 
-        .main .stError,
-        .main .stSubheader,
-        .main .stHeader {
-            color: #ad7334 !important;
-        }
-        /* Delete button styling */
-        .delete-btn {
-            background-color: #ff4444;
-            color: white;
-            border: none;
-            padding: 0.3rem 0.6rem;
-            border-radius: 5px;
-            cursor: pointer;
-            font-size: 0.8rem;
-        }
-        .delete-btn:hover {
-            background-color: #cc0000;
-        }
-        /* Transaction row styling */
-        .transaction-row {
-            border-bottom: 1px solid #e0e0e0;
-            padding: 0.5rem 0;
-        }
-        /* Upload section styling */
-        .upload-section {
-            background-color: #f0f8ff;
-            padding: 1.5rem;
-            border-radius: 10px;
-            border: 2px dashed #ad7334;
-            margin: 1rem 0;
-            color: #ad7334 !important;
-        }
-        .upload-section h4 {
-            color: #ad7334 !important;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-        }
-        .upload-section p {
-            color: #ad7334 !important;
-            margin-bottom: 0;
-            font-size: 0.95rem;
-            line-height: 1.4;
-        }
-        /* Sidebar styling - Keep original colors */
-        .css-1d391kg, .css-1y4p8pa {
-            background-color: #ffffff;
-            color: #2c3e50 !important;
-        }
-        .sidebar .stMarkdown,
-        .sidebar .stText,
-        .sidebar .stAlert,
-        .sidebar .stInfo,
-        .sidebar .stSuccess,
-        .sidebar .stWarning,
-        .sidebar .stError {
-            color: #2c3e50 !important;
-        }
-        /* Theme toggle button */
-        .theme-toggle {
-            background: linear-gradient(45deg, #ad7334, #ff7f0e);
-            color: white;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 25px;
-            font-weight: bold;
-            cursor: pointer;
-            margin: 1rem 0;
-        }
-        /* Fix for specific elements in main content */
-        .main .stMetric {
-            color: #2c3e50;
-        }
-        .main .stMetric label {
-            color: #ad7334 !important;
-        }
-        .main .stDataFrame {
-            color: #2c3e50;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-else:
-    st.markdown(dark_theme_css, unsafe_allow_html=True)
-
-# Initialize session state for transactions
-if 'transactions' not in st.session_state:
-    st.session_state.transactions = []
-
-def add_transaction(date, category, description, amount, transaction_type):
-    """Add a new transaction to the session state"""
-    transaction = {
-        'id': len(st.session_state.transactions),  # Add unique ID for deletion
-        'Date': date,
-        'Category': category,
-        'Description': description,
-        'Amount': amount,
-        'Type': transaction_type
-    }
-    st.session_state.transactions.append(transaction)
-
-def add_transactions_from_dataframe(df):
-    """Add multiple transactions from a DataFrame"""
-    for _, row in df.iterrows():
-        # Check if required columns exist
-        if all(col in row for col in ['Date', 'Category', 'Description', 'Amount', 'Type']):
-            add_transaction(
-                row['Date'],
-                row['Category'],
-                row['Description'],
-                row['Amount'],
-                row['Type']
-            )
-
-def delete_transaction(transaction_id):
-    """Delete a transaction by ID"""
-    st.session_state.transactions = [
-        t for t in st.session_state.transactions if t['id'] != transaction_id
-    ]
-
-def delete_all_transactions():
-    """Delete all transactions"""
-    st.session_state.transactions = []
-
-def calculate_totals():
-    """Calculate total income, expenses, and balance"""
-    if not st.session_state.transactions:
-        return 0, 0, 0
-    
-    df = pd.DataFrame(st.session_state.transactions)
-    total_income = df[df['Type'] == 'Income']['Amount'].sum()
-    total_expenses = df[df['Type'] == 'Expense']['Amount'].sum()
-    balance = total_income - total_expenses
-    
-    return total_income, total_expenses, balance
-
-def export_to_excel():
-    """Export transactions to Excel format"""
-    if not st.session_state.transactions:
-        return None
-    
-    df = pd.DataFrame(st.session_state.transactions)
-    # Remove ID column for export
-    df_export = df.drop('id', axis=1)
-    
-    # Create Excel file in memory
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_export.to_excel(writer, sheet_name='Transactions', index=False)
-        
-        # Add summary sheet
-        summary_data = {
-            'Metric': ['Total Income', 'Total Expenses', 'Balance'],
-            'Amount': [*calculate_totals()]
-        }
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-    
-    output.seek(0)
-    return output
-
-def export_to_pdf():
-    """Export transactions to PDF format"""
-    if not st.session_state.transactions:
-        return None
-    
-    # Create PDF in memory
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title = Paragraph("Expense Tracker Report", styles['Title'])
-    elements.append(title)
-    elements.append(Spacer(1, 12))
-    
-    # Summary
-    total_income, total_expenses, balance = calculate_totals()
-    summary_text = f"Total Income: ${total_income:,.2f} | Total Expenses: ${total_expenses:,.2f} | Balance: ${balance:,.2f}"
-    summary = Paragraph(summary_text, styles['Normal'])
-    elements.append(summary)
-    elements.append(Spacer(1, 20))
-    
-    # Transactions table (without ID)
-    df = pd.DataFrame(st.session_state.transactions)
-    df_display = df.drop('id', axis=1)
-    table_data = [df_display.columns.tolist()] + df_display.values.tolist()
-    
-    # Create table
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    elements.append(table)
-    
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-def process_uploaded_file(uploaded_file):
-    """Process uploaded Excel file and return DataFrame"""
-    try:
-        if uploaded_file.name.endswith('.xlsx'):
-            # Read the Excel file
-            df = pd.read_excel(uploaded_file, sheet_name='Transactions')
-            
-            # Convert Date column to datetime if it's not already
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date']).dt.date
-            
-            # Validate required columns
-            required_columns = ['Date', 'Category', 'Description', 'Amount', 'Type']
-            if all(col in df.columns for col in required_columns):
-                return df
-            else:
-                st.error("❌ Uploaded file is missing required columns.")
-                return None
-        else:
-            st.error("❌ Please upload an Excel file (.xlsx)")
-            return None
-    except Exception as e:
-        st.error(f"❌ Error reading file: {str(e)}")
-        return None
-
-def main():
-    # Header with theme toggle
-    col1, col2, col3 = st.columns([3, 1, 1])
-    
-    with col1:
-        st.markdown('<h1 class="main-header">💰 Personal Expense Tracker</h1>', unsafe_allow_html=True)
-    
-    with col3:
-        theme_icon = "🌙" if st.session_state.theme == 'light' else "☀️"
-        theme_label = "Dark Mode" if st.session_state.theme == 'light' else "Light Mode"
-        if st.button(f"{theme_icon} {theme_label}", key="theme_toggle", help="Switch theme"):
-            toggle_theme()
-            st.rerun()
-    
-    # Sidebar for adding transactions and file upload
-    with st.sidebar:
-        st.header("🎨 Theme")
-        st.write(f"Current theme: **{st.session_state.theme.title()} Mode**")
-        
-        st.header("📁 Data Import/Export")
-        
-        # File upload section
-        st.subheader("Upload Excel File")
-        uploaded_file = st.file_uploader("Choose an Excel file", type=['xlsx'], 
-                                        help="Upload a previously exported Excel file to load your data")
-        
-        if uploaded_file is not None:
-            df = process_uploaded_file(uploaded_file)
-            if df is not None:
-                st.success(f"✅ File loaded successfully! Found {len(df)} transactions.")
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("📥 Replace Current Data", use_container_width=True):
-                        delete_all_transactions()
-                        add_transactions_from_dataframe(df)
-                        st.success("✅ Data replaced successfully!")
-                        st.rerun()
-                
-                with col2:
-                    if st.button("📥 Append to Current Data", use_container_width=True):
-                        add_transactions_from_dataframe(df)
-                        st.success("✅ Data appended successfully!")
-                        st.rerun()
-                
-                # Show preview
-                with st.expander("Preview Uploaded Data"):
-                    st.dataframe(df.head())
-        
-        st.markdown("---")
-        st.header("➕ Add New Transaction")
-        
-        with st.form("transaction_form", clear_on_submit=True):
-            date = st.date_input("Date", datetime.today())
-            category = st.selectbox("Category", [
-                "Fund", "Food & Dining", "Transportation", "Shopping", 
-                "Entertainment", "Bills & Utilities", "Healthcare",
-                "Education", "Travel", "Salary", "Freelance", 
-                "Investments", "Other"
-            ])
-            description = st.text_input("Description")
-            amount = st.number_input("Amount (RM)", min_value=0.0, format="%.2f")
-            transaction_type = st.radio("Type", ["Income", "Expense"])
-            
-            submitted = st.form_submit_button("Add Transaction")
-            
-            if submitted:
-                if description and amount > 0:
-                    add_transaction(date, category, description, amount, transaction_type)
-                    st.success("✅ Transaction added successfully!")
-                else:
-                    st.error("❌ Please fill in all fields correctly.")
-    
-    # Main content area
-    st.header("📊 Financial Summary")
-    
-    total_income, total_expenses, balance = calculate_totals()
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            label="Total Income",
-            value=f"RM{total_income:,.2f}",
-            delta=None
-        )
-    
-    with col2:
-        st.metric(
-            label="Total Expenses",
-            value=f"RM{total_expenses:,.2f}",
-            delta=None
-        )
-    
-    with col3:
-        st.metric(
-            label="Current Balance",
-            value=f"RM{balance:,.2f}",
-            delta=None
-        )
-        
-        # Additional visual indicator
-        if balance > 0:
-            st.success("💰 Positive Balance")
-        elif balance < 0:
-            st.error("⚠️ Negative Balance")
-        else:
-            st.info("⚖️ Balance is Zero")
-    
-    # Transactions table with delete functionality
-    st.header("📋 Transaction History")
-    
-    if st.session_state.transactions:
-        # Display transactions with delete buttons
-        st.subheader("Your Transactions")
-        
-        # Create a DataFrame for display
-        df = pd.DataFrame(st.session_state.transactions)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.sort_values('Date', ascending=False)
-        
-        # Display each transaction with a delete button
-        for i, transaction in enumerate(st.session_state.transactions):
-            col1, col2, col3, col4, col5, col6 = st.columns([2, 2, 3, 2, 2, 1])
-            
-            with col1:
-                st.write(f"**{transaction['Date']}**")
-            with col2:
-                st.write(transaction['Category'])
-            with col3:
-                st.write(transaction['Description'])
-            with col4:
-                amount_color = "#00cc96" if transaction['Type'] == 'Income' else "#ef553b"
-                st.markdown(f"<span style='color: {amount_color}; font-weight: bold;'>${transaction['Amount']:,.2f}</span>", 
-                           unsafe_allow_html=True)
-            with col5:
-                type_color = "#00cc96" if transaction['Type'] == 'Income' else "#ef553b"
-                st.markdown(f"<span style='color: {type_color};'>{transaction['Type']}</span>", 
-                           unsafe_allow_html=True)
-            with col6:
-                # Delete button for each transaction
-                if st.button("🗑️", key=f"delete_{transaction['id']}", help="Delete this transaction"):
-                    delete_transaction(transaction['id'])
-                    st.success("✅ Transaction deleted successfully!")
-                    st.rerun()
-            
-            st.markdown("---")
-        
-        # Alternative: Display as dataframe with bulk delete options
-        st.subheader("Quick Delete Options")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Delete by date range
-            st.write("**Delete by Date Range**")
-            dates = [t['Date'] for t in st.session_state.transactions]
-            min_date = min(dates) if dates else datetime.today().date()
-            max_date = max(dates) if dates else datetime.today().date()
-            
-            start_date = st.date_input("Start Date", min_date, key="delete_start")
-            end_date = st.date_input("End Date", max_date, key="delete_end")
-            
-            if st.button("Delete Transactions in Date Range"):
-                transactions_to_delete = [
-                    t for t in st.session_state.transactions 
-                    if start_date <= t['Date'] <= end_date
-                ]
-                if transactions_to_delete:
-                    for transaction in transactions_to_delete:
-                        delete_transaction(transaction['id'])
-                    st.success(f"✅ Deleted {len(transactions_to_delete)} transactions!")
-                    st.rerun()
-                else:
-                    st.warning("No transactions found in the selected date range.")
-        
-        with col2:
-            # Delete by type
-            st.write("**Delete by Type**")
-            delete_type = st.selectbox("Select type to delete", ["Income", "Expense"])
-            
-            if st.button(f"Delete All {delete_type} Transactions"):
-                transactions_to_delete = [
-                    t for t in st.session_state.transactions 
-                    if t['Type'] == delete_type
-                ]
-                if transactions_to_delete:
-                    for transaction in transactions_to_delete:
-                        delete_transaction(transaction['id'])
-                    st.success(f"✅ Deleted {len(transactions_to_delete)} {delete_type.lower()} transactions!")
-                    st.rerun()
-                else:
-                    st.warning(f"No {delete_type.lower()} transactions found.")
-        
-        # Visualization section
-        st.header("📈 Analytics")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Expenses by Category")
-            if len(df[df['Type'] == 'Expense']) > 0:
-                expense_df = df[df['Type'] == 'Expense']
-                category_totals = expense_df.groupby('Category')['Amount'].sum()
-                
-                fig, ax = plt.subplots(figsize=(8, 6))
-                colors = sns.color_palette('pastel')
-                wedges, texts, autotexts = ax.pie(
-                    category_totals.values, 
-                    labels=category_totals.index, 
-                    autopct='%1.1f%%',
-                    colors=colors
-                )
-                
-                for autotext in autotexts:
-                    autotext.set_color('black')
-                    autotext.set_fontsize(10)
-                
-                ax.set_title('Expense Distribution by Category', fontsize=14, fontweight='bold')
-                st.pyplot(fig)
-            else:
-                st.info("No expense data available for pie chart.")
-        
-        with col2:
-            st.subheader("Income vs Expenses Over Time")
-            if len(df) > 0:
-                # Sort by date and ensure proper datetime format
-                df_sorted = df.sort_values('Date').copy()
-                
-                # Create separate columns for income and expenses
-                df_sorted['Income'] = df_sorted.apply(lambda x: x['Amount'] if x['Type'] == 'Income' else 0, axis=1)
-                df_sorted['Expense'] = df_sorted.apply(lambda x: x['Amount'] if x['Type'] == 'Expense' else 0, axis=1)
-                
-                # Group by date to get daily totals
-                daily_totals = df_sorted.groupby('Date').agg({
-                    'Income': 'sum',
-                    'Expense': 'sum'
-                }).reset_index()
-                
-                # Calculate cumulative values
-                daily_totals['Cumulative_Income'] = daily_totals['Income'].cumsum()
-                daily_totals['Cumulative_Expense'] = daily_totals['Expense'].cumsum()
-                
-                # Create the plot
-                fig, ax = plt.subplots(figsize=(10, 6))
-                
-                # Plot cumulative income and expenses
-                ax.plot(daily_totals['Date'], daily_totals['Cumulative_Income'], 
-                        marker='o', linewidth=2, markersize=4, color='#00cc96', label='Cumulative Income')
-                ax.plot(daily_totals['Date'], daily_totals['Cumulative_Expense'], 
-                        marker='s', linewidth=2, markersize=4, color='#ef553b', label='Cumulative Expenses')
-                
-                # Customize the plot
-                ax.set_xlabel('Date')
-                ax.set_ylabel('Amount (RM)')
-                ax.set_title('Income vs Expenses Over Time', fontsize=14, fontweight='bold')
-                ax.grid(True, alpha=0.3)
-                ax.legend()
-                
-                # Format x-axis dates
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                
-                st.pyplot(fig)
-                
-                # Monthly breakdown
-                st.subheader("Monthly Summary")
-                df_sorted['Month'] = df_sorted['Date'].dt.to_period('M')
-                monthly_summary = df_sorted.groupby(['Month', 'Type'])['Amount'].sum().unstack(fill_value=0)
-                monthly_summary['Balance'] = monthly_summary.get('Income', 0) - monthly_summary.get('Expense', 0)
-                
-                st.dataframe(monthly_summary.style.format("RM{:,.2f}"))
-                
-            else:
-                st.info("Not enough data for time series chart.")
-        
-        # Export section
-        st.header("📤 Export Reports")
-        
-        st.markdown("""
-        <div class="upload-section">
-        <h4>💡 Save Your Data</h4>
-        <p>Export your data to an Excel file to save it permanently. 
-        You can upload this file later to continue where you left off!</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Excel Export")
-            if st.button("📊 Export to Excel", use_container_width=True):
-                excel_file = export_to_excel()
-                if excel_file:
-                    st.download_button(
-                        label="💾 Download Excel File",
-                        data=excel_file,
-                        file_name=f"expense_tracker_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
-        
-        with col2:
-            st.subheader("PDF Export")
-            if st.button("📄 Export to PDF", use_container_width=True):
-                pdf_file = export_to_pdf()
-                if pdf_file:
-                    st.download_button(
-                        label="💾 Download PDF Report",
-                        data=pdf_file,
-                        file_name=f"expense_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
-    
-    else:
-        st.info("📝 No transactions yet. Start by adding transactions using the sidebar form or upload an existing Excel file!")
-        
-        # Quick start guide
-        with st.expander("🚀 Quick Start Guide"):
-            st.markdown("""
-            ### How to get started:
-            
-            1. **Add transactions manually** using the form in the sidebar
-            2. **Upload existing data** by dragging an Excel file to the upload area in the sidebar
-            3. **Export your data** regularly to save your progress
-            
-            ### File Format for Upload:
-            - Use Excel files (.xlsx) exported from this tracker
-            - Required columns: Date, Category, Description, Amount, Type
-            - Type should be either 'Income' or 'Expense'
-            """)
-    
-    # Data Management in Sidebar
-    st.sidebar.markdown("---")
-    st.sidebar.header("⚙️ Data Management")
-    
-    if st.session_state.transactions:
-        st.sidebar.write(f"**Total Transactions:** {len(st.session_state.transactions)}")
-        
-        # Quick delete options in sidebar
-        st.sidebar.subheader("Quick Actions")
-        
-        if st.sidebar.button("🗑️ Delete Last Transaction", use_container_width=True):
-            if st.session_state.transactions:
-                last_transaction = st.session_state.transactions[-1]
-                delete_transaction(last_transaction['id'])
-                st.sidebar.success("Last transaction deleted!")
-                st.rerun()
-        
-        # Clear all data with confirmation
-        if st.sidebar.button("⚠️ Clear All Data", use_container_width=True):
-            st.warning("This will delete ALL transactions. This action cannot be undone!")
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("✅ Yes, Delete Everything", use_container_width=True):
-                    delete_all_transactions()
-                    st.success("All data cleared successfully!")
-                    st.rerun()
-            with col2:
-                if st.button("❌ Cancel", use_container_width=True):
-                    st.info("Deletion cancelled.")
-    else:
-        st.sidebar.info("No transactions to manage.")
-
-if __name__ == "__main__":
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import functools
+import json
+import os
+import time
+import tracemalloc
+import uuid
+import warnings
+warnings.filterwarnings('ignore')
+
+# The ledger, analytics, import and export logic lives in the Streamlit-free
+# expense_core package; this module is the UI on top of it
+from expense_core import (
+    CATEGORIES, DEFAULT_LEDGER, TRANSACTION_COLUMNS, TRANSACTION_TYPES,
+    CHART_MAX_POINTS, ExportJobs, LedgerRegistry, UploadCache, cumulative_chart, describe_rejections,
+    downsample_cumulative, expense_pie_chart, filter_transactions, format_money, transaction_page,
+    validate_transactions,
+)
+
+# Set page configuration
+st.set_page_config(
+    page_title="Expense Tracker",
+    page_icon="💰",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Initialize session state for theme
+if 'theme' not in st.session_state:
+    st.session_state.theme = 'light'
+
+def toggle_theme():
+    """Toggle between light and dark theme"""
+    st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
+
+# Dark theme CSS (unchanged)
+dark_theme_css = """
+<style>
+    .main-header {
+        font-size: 3rem;
+        color: #1f77b4;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .stApp {
+        background-color: #0e1117;
+        color: #fafafa;
+    }
+    .metric-card {
+        background-color: #262730;
+        padding: 1.5rem;
+        border-radius: 15px;
+        margin: 0.5rem 0;
+        border-left: 5px solid #1f77b4;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
+    }
+    .income-card {
+        border-left: 5px solid #00cc96;
+    }
+    .expense-card {
+        border-left: 5px solid #ef553b;
+    }
+    .balance-card {
+        border-left: 5px solid #ffa15a;
+        background: linear-gradient(135deg, #262730 0%, #1c1c1c 100%);
+    }
+    .positive-balance {
+        color: #00cc96;
+        font-weight: bold;
+        font-size: 2.5rem;
+        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
+    }
+    .negative-balance {
+        color: #ef553b;
+        font-weight: bold;
+        font-size: 2.5rem;
+        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
+    }
+    .metric-title {
+        font-size: 1.2rem;
+        font-weight: 600;
+        color: #fafafa;
+        margin-bottom: 0.5rem;
+    }
+    .metric-value {
+        font-size: 2.5rem;
+        font-weight: 700;
+        color: #fafafa;
+    }
+    /* Text colors for dark theme */
+    .stMarkdown, .stText, .stAlert, .stInfo, .stSuccess, .stWarning, .stError {
+        color: #fafafa !important;
+    }
+    /* Delete button styling */
+    .delete-btn {
+        background-color: #ff4444;
+        color: white;
+        border: none;
+        padding: 0.3rem 0.6rem;
+        border-radius: 5px;
+        cursor: pointer;
+        font-size: 0.8rem;
+    }
+    .delete-btn:hover {
+        background-color: #cc0000;
+    }
+    /* Transaction row styling */
+    .transaction-row {
+        border-bottom: 1px solid #444;
+        padding: 0.5rem 0;
+    }
+    /* Upload section styling */
+    .upload-section {
+        background-color: #1c1c1c;
+        padding: 1.5rem;
+        border-radius: 10px;
+        border: 2px dashed #1f77b4;
+        margin: 1rem 0;
+        color: #fafafa !important;
+    }
+    .upload-section h4 {
+        color: #1f77b4 !important;
+        font-weight: 600;
+        margin-bottom: 0.5rem;
+    }
+    .upload-section p {
+        color: #fafafa !important;
+        margin-bottom: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    /* Sidebar styling */
+    .css-1d391kg, .css-1y4p8pa {
+        background-color: #262730;
+    }
+    /* Theme toggle button */
+    .theme-toggle {
+        background: linear-gradient(45deg, #1f77b4, #ff7f0e);
+        color: white;
+        border: none;
+        padding: 0.5rem 1rem;
+        border-radius: 25px;
+        font-weight: bold;
+        cursor: pointer;
+        margin: 1rem 0;
+    }
+    /* Fix for dataframes in dark mode */
+    .dataframe {
+        background-color: #262730 !important;
+        color: #fafafa !important;
+    }
+    .dataframe th {
+        background-color: #1f77b4 !important;
+        color: white !important;
+    }
+    .dataframe td {
+        background-color: #262730 !important;
+        color: #fafafa !important;
+        border-color: #444 !important;
+    }
+</style>
+"""
+
+# Light theme CSS
+light_theme_css = """
+    <style>
+        .main-header {
+            font-size: 3rem;
+            color: #ad7334;
+            text-align: center;
+            margin-bottom: 2rem;
+        }
+        .stApp {
+            background-color: #f9eee2;
+            color: #ad7334;
+        }
+        .metric-card {
+            background-color: #ffffff;
+            padding: 1.5rem;
+            border-radius: 15px;
+            margin: 0.5rem 0;
+            border-left: 5px solid #ad7334;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        }
+        .income-card {
+            border-left: 5px solid #00cc96;
+        }
+        .expense-card {
+            border-left: 5px solid #ef553b;
+        }
+        .balance-card {
+            border-left: 5px solid #ffa15a;
+            background: linear-gradient(135deg, #fffaf0 0%, #f0f2f6 100%);
+        }
+        .positive-balance {
+            color: #00cc96;
+            font-weight: bold;
+            font-size: 2.5rem;
+            text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
+        }
+        .negative-balance {
+            color: #ef553b;
+            font-weight: bold;
+            font-size: 2.5rem;
+            text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
+        }
+        .metric-title {
+            font-size: 1.2rem;
+            font-weight: 600;
+            color: #ad7334;
+            margin-bottom: 0.5rem;
+        }
+        .metric-value {
+            font-size: 2.5rem;
+            font-weight: 700;
+            color: #2c3e50;
+        }
+        /* Main page text colors */
+        .main .stMarkdown, 
+        .main .stText, 
+        .main .stAlert, 
+        .main .stInfo, 
+        .main .stSuccess, 
+        .main .stWarning, 
+        .main .stError,
+        .main .stSubheader,
+        .main .stHeader {
+            color: #ad7334 !important;
+        }
+        /* Delete button styling */
+        .delete-btn {
+            background-color: #ff4444;
+            color: white;
+            border: none;
+            padding: 0.3rem 0.6rem;
+            border-radius: 5px;
+            cursor: pointer;
+            font-size: 0.8rem;
+        }
+        .delete-btn:hover {
+            background-color: #cc0000;
+        }
+        /* Transaction row styling */
+        .transaction-row {
+            border-bottom: 1px solid #e0e0e0;
+            padding: 0.5rem 0;
+        }
+        /* Upload section styling */
+        .upload-section {
+            background-color: #f0f8ff;
+            padding: 1.5rem;
+            border-radius: 10px;
+            border: 2px dashed #ad7334;
+            margin: 1rem 0;
+            color: #ad7334 !important;
+        }
+        .upload-section h4 {
+            color: #ad7334 !important;
+            font-weight: 600;
+            margin-bottom: 0.5rem;
+        }
+        .upload-section p {
+            color: #ad7334 !important;
+            margin-bottom: 0;
+            font-size: 0.95rem;
+            line-height: 1.4;
+        }
+        /* Sidebar styling - Keep original colors */
+        .css-1d391kg, .css-1y4p8pa {
+            background-color: #ffffff;
+            color: #2c3e50 !important;
+        }
+        .sidebar .stMarkdown,
+        .sidebar .stText,
+        .sidebar .stAlert,
+        .sidebar .stInfo,
+        .sidebar .stSuccess,
+        .sidebar .stWarning,
+        .sidebar .stError {
+            color: #2c3e50 !important;
+        }
+        /* Theme toggle button */
+        .theme-toggle {
+            background: linear-gradient(45deg, #ad7334, #ff7f0e);
+            color: white;
+            border: none;
+            padding: 0.5rem 1rem;
+            border-radius: 25px;
+            font-weight: bold;
+            cursor: pointer;
+            margin: 1rem 0;
+        }
+        /* Fix for specific elements in main content */
+        .main .stMetric {
+            color: #2c3e50;
+        }
+        .main .stMetric label {
+            color: #ad7334 !important;
+        }
+        .main .stDataFrame {
+            color: #2c3e50;
+        }
+    </style>
+    """
+
+def apply_theme():
+    """Inject the CSS of the current theme"""
+    st.markdown(light_theme_css if st.session_state.theme == 'light' else dark_theme_css, unsafe_allow_html=True)
+
+# PDF report scopes offered in the Export section (label -> export_to_pdf scope)
+PDF_SCOPES = {"All transactions": 'all', "Last N months": 'recent', "Summary only": 'summary'}
+
+# Rerun profiling: on by default with EXPENSE_TRACKER_PROFILE=1; reports are also
+# appended as JSON lines to EXPENSE_TRACKER_PROFILE_LOG when it is set
+PROFILE_RERUNS = os.environ.get('EXPENSE_TRACKER_PROFILE') == '1'
+PROFILE_LOG = os.environ.get('EXPENSE_TRACKER_PROFILE_LOG', '')
+
+# Transaction History paging and sort options (label -> column, ascending)
+HISTORY_PAGE_SIZES = [10, 25, 50, 100]
+HISTORY_SORT_OPTIONS = {
+    "Newest first": ('Date', False),
+    "Oldest first": ('Date', True),
+    "Largest amount": ('Amount', False),
+    "Smallest amount": ('Amount', True),
+}
+
+@st.cache_resource
+def get_ledgers():
+    """Process-wide registry of named ledgers"""
+    return LedgerRegistry()
+
+# Attach this session to its ledger's shared store, backed by the local
+# database unless persistence is switched off with an empty EXPENSE_TRACKER_DB
+if 'ledger' not in st.session_state:
+    st.session_state.ledger = DEFAULT_LEDGER
+st.session_state.store = get_ledgers().get(st.session_state.ledger)
+# Tags this session's changes, so Undo and Redo only step through its own
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+def add_transaction(date, category, description, amount, transaction_type):
+    """Add a new transaction to this session's ledger"""
+    st.session_state.store.append(date, category, description, amount, transaction_type,
+                                  session=st.session_state.session_id)
+
+def add_transactions_from_dataframe(df, validate=True, skip_duplicates=False):
+    """Add multiple transactions from a DataFrame in a single block.
+
+    Rows are validated first unless `validate` is False (the frame already
+    came from validate_transactions). With `skip_duplicates`, rows already in
+    the ledger are left out and counted in `rejected`. Returns
+    `(added, rejected)`.
+    """
+    rejected = {}
+    if validate:
+        df, rejected = validate_transactions(df)
+    added = st.session_state.store.extend(df, skip_duplicates=skip_duplicates, session=st.session_state.session_id)
+    if len(df) > added:
+        rejected['already in the ledger'] = len(df) - added
+    return added, rejected
+
+def delete_transaction(transaction_id):
+    """Delete a transaction by ID"""
+    return delete_transactions([transaction_id])
+
+def delete_transactions(transaction_ids):
+    """Delete several transactions by ID in a single pass"""
+    return st.session_state.store.delete(transaction_ids, session=st.session_state.session_id)
+
+def delete_transactions_between(start_date, end_date):
+    """Delete every transaction dated within [start_date, end_date]"""
+    return st.session_state.store.delete_between(start_date, end_date, session=st.session_state.session_id)
+
+def delete_all_transactions():
+    """Delete all transactions (Undo brings them back)"""
+    st.session_state.store.clear(session=st.session_state.session_id)
+
+def undo_last_change():
+    """Undo this session's latest change to the ledger; return its journal entry, or None"""
+    return st.session_state.store.undo(session=st.session_state.session_id)
+
+def redo_last_change():
+    """Redo this session's latest undone change to the ledger; return its journal entry, or None"""
+    return st.session_state.store.redo(session=st.session_state.session_id)
+
+def describe_change(entry):
+    """Short description of a journal entry, such as 'delete 3 transactions'"""
+    action, ids, _, _, _ = entry
+    return f"{action} {len(ids)} transaction{'' if len(ids) == 1 else 's'}"
+
+def calculate_totals():
+    """Return total income, expenses, and balance in cents from the running totals"""
+    return st.session_state.store.totals
+
+@st.cache_resource
+def get_upload_cache():
+    """Process-wide cache of parsed upload files"""
+    return UploadCache()
+
+@st.cache_resource
+def get_export_jobs():
+    """Process-wide export job runner"""
+    return ExportJobs()
+
+def show_export_job(job, label, file_name, mime, key=None):
+    """Progress of a running export, or the download button once it is built.
+
+    `key` tells the progress buttons of two places showing the same kind of
+    export apart (the job kind by default).
+    """
+    if not job.done:
+        st.progress(job.progress, text=f"{job.message}...")
+        st.button("🔄 Check Progress", key=f"refresh_{key or job.key[0]}", use_container_width=True)
+    elif job.error is not None:
+        st.error(f"❌ Export failed: {job.error}")
+    else:
+        st.download_button(
+            label=label,
+            data=job.result,
+            file_name=file_name,
+            mime=mime,
+            use_container_width=True
+        )
+
+# Data export formats offered in the sidebar (label -> export job kind, extension, MIME type)
+DATA_EXPORT_FORMATS = {
+    "Excel (.xlsx)": ('excel', "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV (.csv)": ('csv', "csv", "text/csv"),
+    "Parquet (.parquet)": ('parquet', "parquet", "application/vnd.apache.parquet"),
+}
+
+def process_uploaded_file(uploaded_file):
+    """Process an uploaded Excel, CSV or Parquet file and return DataFrame.
+
+    The file stays in the uploader across reruns, so the parsed frame is
+    cached on the file's content and only parsed again when it changes.
+    """
+    upload_cache = get_upload_cache()
+    try:
+        df, rejected, parse_seconds, cached = upload_cache.read(uploaded_file.getvalue(), uploaded_file.name)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return None
+    except Exception as e:
+        st.error(f"❌ Error reading file: {str(e)}")
+        return None
+    
+    if rejected:
+        st.warning(f"⚠️ Skipped {sum(rejected.values())} invalid rows: {describe_rejections(rejected)}")
+    st.caption(f"Parsed in {parse_seconds:.2f}s{' (from cache)' if cached else ''} · "
+               f"upload cache: {upload_cache.hits} hits, {upload_cache.misses} misses")
+    return df
+
+class RerunProfiler:
+    """Wall time, and optionally traced allocations, per section of one rerun.
+
+    `section(name)` ends the running section and starts the next one, so the
+    page code only needs a call where each section begins; `finish()` ends
+    the last one. A disabled profiler records nothing. tracemalloc traces the
+    whole process, so allocation figures include other sessions' reruns that
+    overlap with this one.
+    """
+
+    def __init__(self, enabled=False, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.sections = []
+        self._current = None
+        self._started_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def section(self, name):
+        """Start timing `name`, ending the previous section"""
+        if not self.enabled:
+            return
+        self._end_section()
+        self._current = {'name': name, 'start': time.perf_counter()}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self._current['memory'] = tracemalloc.get_traced_memory()[0]
+
+    def _end_section(self):
+        if self._current is None:
+            return
+        current = self._current
+        record = {'section': current['name'], 'seconds': time.perf_counter() - current['start']}
+        if self.trace_memory:
+            memory, peak = tracemalloc.get_traced_memory()
+            record['allocated_kib'] = (memory - current['memory']) / 1024
+            record['peak_kib'] = (peak - current['memory']) / 1024
+        self.sections.append(record)
+        self._current = None
+
+    def finish(self):
+        """End the last section and stop tracing if this profiler started it"""
+        self._end_section()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self, **context):
+        """Measurements of this rerun with extra `context` fields, JSON-serializable"""
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            **context,
+            'total_seconds': sum(record['seconds'] for record in self.sections),
+            'sections': self.sections,
+        }
+
+def show_profile(profiler, store):
+    """Sidebar "Performance" expander with the profiling switches and this rerun's timings"""
+    with st.sidebar.expander("⏱️ Performance"):
+        st.checkbox("Profile reruns", value=PROFILE_RERUNS, key="profile_reruns",
+                    help="Time each page section on every rerun")
+        st.checkbox("Trace memory allocations", key="profile_memory",
+                    help="Also record allocations with tracemalloc (slows reruns down)")
+        # Fragment reruns of single sections count here too, not only full reruns
+        section_runs = st.session_state.get('section_runs', {})
+        st.caption("Section runs this session: "
+                   + ", ".join(f"{name} {runs}" for name, runs in section_runs.items()))
+        if not profiler.enabled:
+            st.caption("Turn on profiling to time the next rerun.")
+            return
+        
+        report = profiler.report(ledger=st.session_state.ledger, transactions=len(store),
+                                 theme=st.session_state.theme)
+        table = pd.DataFrame(report['sections']).set_index('section')
+        table['seconds'] = table['seconds'].map(lambda seconds: f"{seconds * 1000:,.1f} ms")
+        for column in ('allocated_kib', 'peak_kib'):
+            if column in table:
+                table[column] = table[column].map(lambda kib: f"{kib:,.1f} KiB")
+        st.dataframe(table, use_container_width=True)
+        st.caption(f"Total: {report['total_seconds'] * 1000:,.1f} ms")
+        
+        report_json = json.dumps(report, indent=2)
+        st.download_button(
+            label="⬇️ Download JSON",
+            data=report_json,
+            file_name=f"expense_tracker_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            use_container_width=True
+        )
+        if PROFILE_LOG:
+            with open(PROFILE_LOG, 'a') as f:
+                f.write(json.dumps(report) + '\n')
+
+def data_changed():
+    """Whether the ledger moved on since the page was last drawn in full"""
+    store = st.session_state.store
+    return st.session_state.get('page_version') != (store.uid, store.version)
+
+def page_section(name, fragment=True):
+    """Decorator for one section of the page, counting its runs in `section_runs`.
+
+    With `fragment`, the section is an `st.fragment`: interacting with its
+    own widgets reruns just that section. Everything else on the page
+    depends on the ledger's data version, so a section rerun that finds the
+    data changed, before drawing or because of it, reruns the whole page.
+    """
+    def decorate(draw):
+        @functools.wraps(draw)
+        def run():
+            in_fragment_rerun = fragment and not st.session_state.get('drawing_page')
+            if in_fragment_rerun and data_changed():
+                st.rerun()
+            section_runs = st.session_state.setdefault('section_runs', {})
+            section_runs[name] = section_runs.get(name, 0) + 1
+            draw()
+            if in_fragment_rerun and data_changed():
+                st.rerun()
+        return st.fragment(run) if fragment else run
+    return decorate
+
+@page_section("Header")
+def header_section():
+    """Title and theme toggle; switching theme reruns only this section"""
+    apply_theme()
+    col1, col2, col3 = st.columns([3, 1, 1])
+    
+    with col1:
+        st.markdown('<h1 class="main-header">💰 Personal Expense Tracker</h1>', unsafe_allow_html=True)
+    
+    with col3:
+        theme_icon = "🌙" if st.session_state.theme == 'light' else "☀️"
+        theme_label = "Dark Mode" if st.session_state.theme == 'light' else "Light Mode"
+        st.button(f"{theme_icon} {theme_label}", key="theme_toggle", help="Switch theme", on_click=toggle_theme)
+
+@page_section("Data Import/Export")
+def import_export_section():
+    """Sidebar upload and download of the ledger as a file"""
+    st.header("📁 Data Import/Export")
+    
+    # File upload section
+    st.subheader("Upload Data File")
+    uploaded_file = st.file_uploader("Choose an Excel, CSV or Parquet file", type=['xlsx', 'csv', 'parquet'], 
+                                    help="Upload a previously exported file to load your data")
+    
+    if uploaded_file is not None:
+        df = process_uploaded_file(uploaded_file)
+        if df is not None:
+            st.success(f"✅ File loaded successfully! Found {len(df)} valid transactions.")
+            
+            # Rows matching ones already stored, e.g. from re-uploading an overlapping export
+            duplicates = int(st.session_state.store.find_duplicates(df).sum())
+            skip_duplicates = False
+            if duplicates:
+                st.warning(f"⚠️ {duplicates} of these transactions are already in the ledger.")
+                skip_duplicates = st.checkbox("Skip them when appending", value=True, key="skip_duplicates")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("📥 Replace Current Data", use_container_width=True):
+                    delete_all_transactions()
+                    add_transactions_from_dataframe(df, validate=False)
+                    st.success("✅ Data replaced successfully!")
+                    st.rerun()
+            
+            with col2:
+                if st.button("📥 Append to Current Data", use_container_width=True):
+                    added, _ = add_transactions_from_dataframe(
+                        df, validate=False, skip_duplicates=skip_duplicates
+                    )
+                    # A toast survives the rerun below, unlike st.success
+                    st.toast(f"✅ Appended {added} new transactions"
+                             + (f", skipped {len(df) - added} already in the ledger" if len(df) > added else ""))
+                    st.rerun()
+            
+            # Show preview
+            with st.expander("Preview Uploaded Data"):
+                st.dataframe(df.head())
+    
+    # Download section
+    if len(st.session_state.store):
+        st.subheader("Download Data")
+        export_format = st.selectbox("Format", list(DATA_EXPORT_FORMATS), key="data_export_format")
+        # Built in the background once per data version, like the report exports;
+        # preparing the same download again reuses the bytes
+        kind, extension, mime = DATA_EXPORT_FORMATS[export_format]
+        export_job = get_export_jobs().get(kind, st.session_state.store)
+        if st.button("💾 Prepare Download", use_container_width=True):
+            export_job = get_export_jobs().submit(kind, st.session_state.store)
+        if export_job is not None:
+            show_export_job(
+                export_job,
+                f"⬇️ Download {export_format}",
+                f"expense_tracker_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}",
+                mime,
+                key=f"data_{kind}"
+            )
+
+@page_section("Financial Summary", fragment=False)
+def summary_section():
+    """Income, expense and balance totals"""
+    st.header("📊 Financial Summary")
+    
+    total_income, total_expenses, balance = calculate_totals()
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            label="Total Income",
+            value=format_money(total_income),
+            delta=None
+        )
+    
+    with col2:
+        st.metric(
+            label="Total Expenses",
+            value=format_money(total_expenses),
+            delta=None
+        )
+    
+    with col3:
+        st.metric(
+            label="Current Balance",
+            value=format_money(balance),
+            delta=None
+        )
+        
+        # Additional visual indicator
+        if balance > 0:
+            st.success("💰 Positive Balance")
+        elif balance < 0:
+            st.error("⚠️ Negative Balance")
+        else:
+            st.info("⚖️ Balance is Zero")
+
+@page_section("Transaction History")
+def history_section():
+    """Filterable, paged table of the transactions with row deletion"""
+    store = st.session_state.store
+    
+    # Display one page of transactions with selectable rows for deletion
+    st.subheader("Your Transactions")
+    
+    # Shared view of the stored transactions
+    transactions = store.frame
+    
+    col1, col2, col3, col4, col5 = st.columns([2, 3, 3, 2, 2])
+    with col1:
+        type_filter = st.selectbox("Type", ["All"] + TRANSACTION_TYPES, key="history_type")
+    with col2:
+        category_filter = st.multiselect("Category", list(transactions['Category'].cat.categories),
+                                         key="history_categories")
+    with col3:
+        search = st.text_input("Search descriptions", key="history_search")
+    with col4:
+        sort_by = st.selectbox("Sort by", list(HISTORY_SORT_OPTIONS), key="history_sort")
+    with col5:
+        page_size = st.selectbox("Rows per page", HISTORY_PAGE_SIZES, index=1, key="history_page_size")
+    
+    # Filter and sort the whole ledger, then render only the visible page.
+    # Type/category selections and date order come from the store's index.
+    filters = dict(
+        transaction_type=None if type_filter == "All" else type_filter,
+        categories=category_filter
+    )
+    sort_column, ascending = HISTORY_SORT_OPTIONS[sort_by]
+    if sort_column == 'Date':
+        ordered = filter_transactions(store.by_date(ascending, **filters), search=search)
+    else:
+        ordered = filter_transactions(store.select(**filters), search=search).sort_values(
+            sort_column, ascending=ascending, kind='stable'
+        )
+    
+    if len(ordered):
+        page_count = -(-len(ordered) // page_size)
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+        visible = transaction_page(ordered, page, page_size)
+        first_row = (page - 1) * page_size + 1
+        st.caption(f"Showing {first_row}-{first_row + len(visible) - 1} of {len(ordered)} transactions")
+        
+        edited = st.data_editor(
+            visible.assign(Delete=False, Amount=visible['Amount'] / 100)[['Delete'] + TRANSACTION_COLUMNS],
+            # Keyed on the rows shown so a stale selection never carries over
+            key=f"history_{hash(tuple(visible.index))}",
+            hide_index=True,
+            disabled=TRANSACTION_COLUMNS,
+            use_container_width=True,
+            column_config={
+                "Delete": st.column_config.CheckboxColumn("🗑️", help="Select to delete"),
+                "Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                "Amount": st.column_config.NumberColumn(format="RM%.2f"),
+            }
+        )
+        
+        selected = edited.index[edited['Delete']]
+        if st.button(f"🗑️ Delete Selected ({len(selected)})", disabled=not len(selected)):
+            deleted = delete_transactions(selected)
+            st.success(f"✅ Deleted {deleted} transactions!")
+            st.rerun()
+    else:
+        st.info("No transactions match the current filters.")
+
+@page_section("Quick Delete")
+def quick_delete_section():
+    """Deletion by date range or by type"""
+    store = st.session_state.store
+    
+    st.subheader("Quick Delete Options")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Delete by date range
+        st.write("**Delete by Date Range**")
+        min_date, max_date = (date.date() for date in store.date_range)
+        
+        start_date = st.date_input("Start Date", min_date, key="delete_start")
+        end_date = st.date_input("End Date", max_date, key="delete_end")
+        
+        if st.button("Delete Transactions in Date Range"):
+            deleted = delete_transactions_between(start_date, end_date)
+            if deleted:
+                st.success(f"✅ Deleted {deleted} transactions!")
+                st.rerun()
+            else:
+                st.warning("No transactions found in the selected date range.")
+    
+    with col2:
+        # Delete by type
+        st.write("**Delete by Type**")
+        delete_type = st.selectbox("Select type to delete", ["Income", "Expense"])
+        
+        if st.button(f"Delete All {delete_type} Transactions"):
+            deleted = delete_transactions(store.ids_for(transaction_type=delete_type))
+            if deleted:
+                st.success(f"✅ Deleted {deleted} {delete_type.lower()} transactions!")
+                st.rerun()
+            else:
+                st.warning(f"No {delete_type.lower()} transactions found.")
+
+@page_section("Analytics")
+def analytics_section():
+    """Category pie, cumulative chart and monthly summary"""
+    store = st.session_state.store
+    
+    st.header("📈 Analytics")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Expenses by Category")
+        # Per-category sums kept by the index; categories without expenses are left out
+        expense_totals = store.category_totals('Expense')
+        if len(expense_totals):
+            st.altair_chart(expense_pie_chart(expense_totals), use_container_width=True)
+        else:
+            st.info("No expense data available for pie chart.")
+    
+    with col2:
+        st.subheader("Income vs Expenses Over Time")
+        if len(store) > 0:
+            # Daily cumulative totals from the store's rollup, downsampled to a fixed
+            # number of points; zooming in re-reads the narrower range at finer detail
+            daily_totals = store.daily_totals()
+            first_date, last_date = (date.date() for date in store.date_range)
+            zoom = (first_date, last_date)
+            if first_date < last_date:
+                zoom = st.slider("Zoom", first_date, last_date, zoom, format="YYYY-MM-DD", key="chart_zoom")
+            points = downsample_cumulative(daily_totals, CHART_MAX_POINTS, *zoom)
+            st.altair_chart(cumulative_chart(points), use_container_width=True)
+            days_shown = daily_totals['Date'].between(pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1])).sum()
+            st.caption(f"Plotting {len(points):,} of {days_shown:,} days")
+            
+            # Monthly breakdown, converted to currency units for display
+            st.subheader("Monthly Summary")
+            monthly_summary = store.monthly_summary() / 100
+            monthly_summary.index = monthly_summary.index.astype(str)
+            st.dataframe(monthly_summary, column_config={
+                column: st.column_config.NumberColumn(format="RM%.2f") for column in monthly_summary.columns
+            })
+            
+        else:
+            st.info("Not enough data for time series chart.")
+
+@page_section("Export")
+def export_section():
+    """Excel and PDF report exports"""
+    store = st.session_state.store
+    
+    st.header("📤 Export Reports")
+    
+    if store.backend is not None:
+        save_note = """Your transactions are saved automatically to the local database. 
+    Export them to an Excel file to keep a copy or move them to another machine!"""
+    else:
+        save_note = """Export your data to an Excel file to save it permanently. 
+    You can upload this file later to continue where you left off!"""
+    
+    st.markdown(f"""
+    <div class="upload-section">
+    <h4>💡 Save Your Data</h4>
+    <p>{save_note}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Exports are built in the background and cached per data version
+    export_jobs = get_export_jobs()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Excel Export")
+        month_sheets = st.checkbox("Add a sheet per month", key="excel_month_sheets")
+        excel_options = (True,) if month_sheets else ()
+        excel_job = export_jobs.get('excel', store, excel_options)
+        if st.button("📊 Export to Excel", use_container_width=True):
+            excel_job = export_jobs.submit('excel', store, excel_options)
+        if excel_job is not None:
+            show_export_job(
+                excel_job,
+                "💾 Download Excel File",
+                f"expense_tracker_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+    
+    with col2:
+        st.subheader("PDF Export")
+        pdf_scope = st.radio("Report contents", list(PDF_SCOPES), key="pdf_scope", horizontal=True)
+        pdf_months = 12
+        if PDF_SCOPES[pdf_scope] == 'recent':
+            pdf_months = st.number_input("Months", min_value=1, max_value=120, value=12, key="pdf_months")
+        pdf_grouped = PDF_SCOPES[pdf_scope] != 'summary' and st.checkbox(
+            "Group by month with subtotals", key="pdf_group_by_month"
+        )
+        pdf_charts = st.checkbox("Include charts", key="pdf_charts")
+        pdf_options = (PDF_SCOPES[pdf_scope], pdf_months, pdf_grouped, pdf_charts)
+        pdf_job = export_jobs.get('pdf', store, pdf_options)
+        if st.button("📄 Export to PDF", use_container_width=True):
+            pdf_job = export_jobs.submit('pdf', store, pdf_options)
+        if pdf_job is not None:
+            show_export_job(
+                pdf_job,
+                "💾 Download PDF Report",
+                f"expense_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+                "application/pdf"
+            )
+
+@page_section("Data Management", fragment=False)
+def data_management_section():
+    """Sidebar ledger size, undo/redo and bulk actions"""
+    store = st.session_state.store
+    
+    st.sidebar.markdown("---")
+    st.sidebar.header("⚙️ Data Management")
+    
+    # Undo and redo only step through this session's changes, so sessions
+    # sharing the ledger never revert each other's
+    session = st.session_state.session_id
+    undo_entry, redo_entry = store.journal.undo_entry(session), store.journal.redo_entry(session)
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        if st.button("↩️ Undo", use_container_width=True, disabled=undo_entry is None,
+                     help=f"Undo: {describe_change(undo_entry)}" if undo_entry else None):
+            undone = undo_last_change()
+            if undone is not None:
+                st.toast(f"↩️ Undone: {describe_change(undone)}")
+            st.rerun()
+    with col2:
+        if st.button("↪️ Redo", use_container_width=True, disabled=redo_entry is None,
+                     help=f"Redo: {describe_change(redo_entry)}" if redo_entry else None):
+            redone = redo_last_change()
+            if redone is not None:
+                st.toast(f"↪️ Redone: {describe_change(redone)}")
+            st.rerun()
+    
+    if len(store):
+        st.sidebar.write(f"**Total Transactions:** {len(store)}")
+        
+        # Quick delete options in sidebar
+        st.sidebar.subheader("Quick Actions")
+        
+        if st.sidebar.button("🗑️ Delete Last Transaction", use_container_width=True):
+            if len(store):
+                delete_transaction(store.last_id)
+                st.sidebar.success("Last transaction deleted!")
+                st.rerun()
+        
+        # Clear all data with confirmation. The confirmation buttons are
+        # clicked on a later rerun, when the first button reads False again,
+        # so the first click is remembered in session state
+        if st.sidebar.button("⚠️ Clear All Data", use_container_width=True):
+            st.session_state.confirm_clear = True
+        if st.session_state.get('confirm_clear'):
+            st.sidebar.warning("This will delete ALL transactions. Undo brings them back.")
+            col1, col2 = st.sidebar.columns(2)
+            with col1:
+                if st.button("✅ Yes, Delete Everything", use_container_width=True):
+                    delete_all_transactions()
+                    st.session_state.confirm_clear = False
+                    # A toast survives the rerun below, unlike st.success
+                    st.toast("All data cleared successfully!")
+                    st.rerun()
+            with col2:
+                if st.button("❌ Cancel", use_container_width=True):
+                    st.session_state.confirm_clear = False
+                    st.rerun()
+    else:
+        st.sidebar.info("No transactions to manage.")
+
+def render_page(profiler):
+    """Draw the whole app, marking each section's start on `profiler`.
+
+    Sections other than the Financial Summary and Data Management are
+    fragments, which interactions can also rerun on their own.
+    """
+    # Header with theme toggle
+    header_section()
+    
+    # Sidebar for adding transactions and file upload
+    with st.sidebar:
+        st.header("📒 Ledger")
+        ledgers = get_ledgers()
+        ledger_names = ledgers.names()
+        if st.session_state.ledger not in ledger_names:
+            ledger_names.append(st.session_state.ledger)
+        ledger = st.selectbox("Open ledger", ledger_names, index=ledger_names.index(st.session_state.ledger),
+                              help="Everyone who opens the same ledger shares its data")
+        new_ledger = st.text_input("New ledger name", key="new_ledger",
+                                   help="Letters, digits, '-' and '_'")
+        if st.button("➕ Create Ledger", use_container_width=True, disabled=not new_ledger):
+            try:
+                ledgers.get(new_ledger)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                ledger = new_ledger
+        if ledger != st.session_state.ledger:
+            st.session_state.ledger = ledger
+            st.rerun()
+        
+        import_export_section()
+        
+        st.markdown("---")
+        st.header("➕ Add New Transaction")
+        
+        with st.form("transaction_form", clear_on_submit=True):
+            date = st.date_input("Date", datetime.today())
+            category = st.selectbox("Category", CATEGORIES)
+            description = st.text_input("Description")
+            amount = st.number_input("Amount (RM)", min_value=0.0, format="%.2f")
+            transaction_type = st.radio("Type", ["Income", "Expense"])
+            
+            submitted = st.form_submit_button("Add Transaction")
+            
+            if submitted:
+                if description and amount > 0:
+                    add_transaction(date, category, description, amount, transaction_type)
+                    st.success("✅ Transaction added successfully!")
+                else:
+                    st.error("❌ Please fill in all fields correctly.")
+    
+    # Main content area
+    profiler.section("Financial Summary")
+    summary_section()
+    
+    # Transactions table with delete functionality
+    profiler.section("Transaction History")
+    st.header("📋 Transaction History")
+    
+    if len(st.session_state.store):
+        history_section()
+        
+        # Alternative: Display as dataframe with bulk delete options
+        profiler.section("Quick Delete")
+        quick_delete_section()
+        
+        # Visualization section
+        profiler.section("Analytics")
+        analytics_section()
+        
+        # Export section
+        profiler.section("Export")
+        export_section()
+    
+    else:
+        st.info("📝 No transactions yet. Start by adding transactions using the sidebar form or upload an existing Excel file!")
+        
+        # Quick start guide
+        with st.expander("🚀 Quick Start Guide"):
+            st.markdown("""
+            ### How to get started:
+            
+            1. **Add transactions manually** using the form in the sidebar
+            2. **Upload existing data** by dragging an Excel file to the upload area in the sidebar
+            3. **Export your data** regularly to save your progress
+            
+            ### File Format for Upload:
+            - Use Excel (.xlsx), CSV (.csv) or Parquet (.parquet) files exported from this tracker
+            - Required columns: Date, Category, Description, Amount, Type
+            - Type should be either 'Income' or 'Expense'
+            """)
+    
+    # Data Management in Sidebar
+    profiler.section("Data Management")
+    data_management_section()
+
+def main():
+    # Opt-in timing of the page sections, controlled from the Performance expander
+    profiler = RerunProfiler(
+        st.session_state.get('profile_reruns', PROFILE_RERUNS),
+        st.session_state.get('profile_memory', False)
+    )
+    # Sections drawn from here are part of a full rerun, not fragment reruns
+    st.session_state.drawing_page = True
+    try:
+        render_page(profiler)
+        # The data version the page now shows; fragment reruns compare against it
+        store = st.session_state.store
+        st.session_state.page_version = (store.uid, store.version)
+    finally:
+        # Also runs when a button triggers st.rerun() mid-page
+        st.session_state.drawing_page = False
+        profiler.finish()
+    show_profile(profiler, st.session_state.store)
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""Shared setup for the test suite."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# Keep test ledgers in memory, never in the app's database
+os.environ['EXPENSE_TRACKER_DB'] = ''
+
+from common import make_ledger as synthetic_ledger  # noqa: E402
+
+
+@pytest.fixture
+def make_ledger():
+    """The benchmarks' reproducible synthetic ledger generator, `make_ledger(n, seed=0)`"""
+    return synthetic_ledger
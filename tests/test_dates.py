@@ -0,0 +1,68 @@
+"""Transactions are kept by day, in memory the same as in the database and the exports."""
+import datetime
+import io
+
+import pandas as pd
+
+from expense_core import SQLiteLedger, TransactionStore, export_to_csv, read_csv_transactions
+
+CSV_WITH_TIMES = b"""Date,Category,Description,Amount,Type
+2024-03-01 15:30,Food & Dining,Lunch,12.50,Expense
+2024-03-01 23:59,Salary,Monthly salary,5000.00,Income
+2024-03-02 07:05,Transportation,Train fare,3.20,Expense
+"""
+
+
+def read_upload():
+    valid, rejected = read_csv_transactions(io.BytesIO(CSV_WITH_TIMES))
+    assert not rejected
+    return valid
+
+
+def test_uploads_and_stored_rows_drop_the_time_of_day():
+    dates = read_upload()['Date']
+    assert (dates == dates.dt.normalize()).all()
+
+    store = TransactionStore()
+    store.extend(pd.DataFrame({
+        'Date': [pd.Timestamp('2024-03-01 15:30')], 'Category': ['Food & Dining'], 'Description': ['Lunch'],
+        'Amount': [12.5], 'Type': ['Expense'],
+    }))
+    store.append(datetime.datetime(2024, 3, 1, 8, 15), 'Food & Dining', 'Coffee', 4.2, 'Expense')
+    assert store.frame['Date'].tolist() == [pd.Timestamp('2024-03-01')] * 2
+
+
+def test_reloaded_ledger_matches_and_recognises_the_same_upload(tmp_path):
+    db_path = str(tmp_path / 'ledger.db')
+    store = TransactionStore(SQLiteLedger(db_path))
+    store.extend(read_upload())
+
+    reloaded = TransactionStore(SQLiteLedger(db_path))
+    assert reloaded.frame.astype(store.frame.dtypes).equals(store.frame)
+    assert reloaded.find_duplicates(read_upload()).all()
+    assert reloaded.extend(read_upload(), skip_duplicates=True) == 0
+
+
+def test_exported_csv_is_recognised_on_reimport():
+    store = TransactionStore()
+    store.extend(read_upload())
+    exported, _ = read_csv_transactions(export_to_csv(store))
+    assert store.find_duplicates(exported).all()
+
+
+def test_single_day_range_delete_covers_the_whole_day():
+    store = TransactionStore()
+    store.extend(read_upload())
+    assert store.delete_between(datetime.date(2024, 3, 1), datetime.date(2024, 3, 1)) == 2
+    assert store.frame['Description'].tolist() == ['Train fare']
+
+
+def test_date_range_skips_deleted_rows_at_either_end(make_ledger):
+    store = TransactionStore()
+    store.extend(make_ledger(500))
+    by_date = store.by_date()
+    store.delete(by_date.index[:40].append(by_date.index[-25:]))
+    frame = store.frame
+    assert store.date_range == (frame['Date'].min(), frame['Date'].max())
+    store.clear()
+    assert store.date_range is None
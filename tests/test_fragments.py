@@ -0,0 +1,138 @@
+"""Which page sections each kind of interaction re-executes.
+
+Every interaction starts from a fully drawn page, and its result is the
+number of runs each section added to the app's public `section_runs`
+counter. Widgets inside a fragment should rerun only their own section,
+while anything that changes the ledger should redraw the whole page.
+
+AppTest always reruns the whole script and has no public way to rerun one
+fragment, which is what the browser sends for a widget inside a fragment.
+`rerun_fragment` replays that through AppTest internals; requirements-dev.txt
+keeps Streamlit below FRAGMENT_RERUN_CHECKED_BELOW, the first release they
+have not been checked against, and the test fails loudly past it.
+"""
+import datetime
+import functools
+import os
+from unittest import mock
+
+import pytest
+import streamlit
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'expense_tracker.py')
+
+# First Streamlit release whose AppTest internals rerun_fragment has not been checked against
+FRAGMENT_RERUN_CHECKED_BELOW = (1, 67)
+
+# Sections drawn on every full rerun of a non-empty ledger
+ALL_SECTIONS = [
+    'Header', 'Data Import/Export', 'Financial Summary', 'Transaction History', 'Quick Delete',
+    'Analytics', 'Export', 'Data Management',
+]
+
+
+def rerun_fragment(at, fragment):
+    """Run only the fragment drawn by the section function named `fragment`, like the browser does"""
+    version = tuple(int(part) for part in streamlit.__version__.split('.')[:2])
+    if version >= FRAGMENT_RERUN_CHECKED_BELOW:
+        pytest.fail(f"Fragment reruns are replayed through AppTest internals checked below Streamlit "
+                    f"{'.'.join(map(str, FRAGMENT_RERUN_CHECKED_BELOW))}; check them against "
+                    f"{streamlit.__version__} and raise FRAGMENT_RERUN_CHECKED_BELOW")
+    # The section functions are wrapped twice (page_section, then st.fragment);
+    # find the fragment whose closure holds the section function
+    fragment_ids = {}
+    for fragment_id, wrapped in at._fragment_storage._fragments.items():
+        for cell in wrapped.__closure__ or ():
+            if hasattr(cell.cell_contents, '__wrapped__'):
+                fragment_ids[cell.cell_contents.__name__] = fragment_id
+    rerun_data = functools.partial(RerunData, fragment_id_queue=[fragment_ids[fragment]])
+    with mock.patch.object(local_script_runner, 'RerunData', rerun_data):
+        return at.run()
+
+
+def section_runs(at, interact, fragment=None):
+    """Runs added to each section by `interact(at)` and the rerun it triggers"""
+    at.run()
+    before = dict(at.session_state['section_runs'])
+    interact(at)
+    if fragment is None:
+        at.run()
+    else:
+        rerun_fragment(at, fragment)
+    assert not at.exception, at.exception
+    after = at.session_state['section_runs']
+    return {name: after[name] - before.get(name, 0) for name in after if after[name] != before.get(name, 0)}
+
+
+def add_transaction(at):
+    labels = {widget.label: widget for kind in ('text_input', 'number_input', 'radio', 'date_input')
+              for widget in getattr(at.sidebar, kind)}
+    labels['Description'].input('Check fragments')
+    labels['Amount (RM)'].set_value(12.5)
+    labels['Type'].set_value('Expense')
+    labels['Date'].set_value(datetime.date(2024, 6, 1))
+    next(button for button in at.sidebar.button if button.label == 'Add Transaction').click()
+
+
+def zoom_chart(at):
+    low, high = at.slider(key='chart_zoom').value
+    at.slider(key='chart_zoom').set_value((low + (high - low) / 2, high))
+
+
+def changed_elsewhere(at):
+    """Another session adds to the shared ledger, then this one zooms the chart"""
+    at.session_state['store'].append(datetime.date(2024, 6, 1), 'Food & Dining', 'Elsewhere', 9.5, 'Expense')
+    zoom_chart(at)
+
+
+# name -> (interaction, fragment its widget lives in or None, expected section runs)
+INTERACTIONS = {
+    'switch theme': (
+        lambda at: at.button(key='theme_toggle').click(), 'header_section', {'Header': 1}
+    ),
+    'choose download format': (
+        lambda at: at.selectbox(key='data_export_format').set_value('CSV (.csv)'), 'import_export_section',
+        {'Data Import/Export': 1}
+    ),
+    'filter history': (
+        lambda at: at.selectbox(key='history_type').set_value('Expense'), 'history_section',
+        {'Transaction History': 1}
+    ),
+    'turn history page': (
+        lambda at: next(n for n in at.number_input if n.label.startswith('Page')).set_value(2), 'history_section',
+        {'Transaction History': 1}
+    ),
+    'zoom chart': (zoom_chart, 'analytics_section', {'Analytics': 1}),
+    'change PDF options': (
+        lambda at: at.checkbox(key='pdf_charts').check(), 'export_section', {'Export': 1}
+    ),
+    'delete by type': (
+        lambda at: next(b for b in at.button if b.label == 'Delete All Income Transactions').click(),
+        'quick_delete_section', {**dict.fromkeys(ALL_SECTIONS, 1), 'Quick Delete': 2}
+    ),
+    'add transaction': (add_transaction, None, dict.fromkeys(ALL_SECTIONS, 1)),
+    'ledger changed elsewhere': (changed_elsewhere, 'analytics_section', dict.fromkeys(ALL_SECTIONS, 1)),
+}
+
+
+@pytest.mark.parametrize('name', list(INTERACTIONS))
+def test_interaction_reruns_only_the_sections_it_affects(make_ledger, name):
+    interact, fragment, expected = INTERACTIONS[name]
+    # A fresh in-memory ledger per interaction, as deletes and adds change it
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.session_state['ledger'] = f'test-{name.replace(" ", "-")}'
+    at.run()
+    at.session_state['store'].extend(make_ledger(1_000))
+
+    assert section_runs(at, interact, fragment) == expected
+
+
+def test_full_rerun_draws_every_section_once(make_ledger):
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.session_state['ledger'] = 'test-full-rerun'
+    at.run()
+    at.session_state['store'].extend(make_ledger(1_000))
+
+    assert section_runs(at, lambda at: None) == dict.fromkeys(ALL_SECTIONS, 1)
@@ -0,0 +1,16 @@
+"""Starting the app leaves the chart and PDF libraries unloaded until a section needs them."""
+import os
+import subprocess
+import sys
+
+from bench_import_time import LAZY_MODULES, ROOT
+
+
+def test_app_import_keeps_chart_and_pdf_libraries_lazy():
+    # A fresh interpreter, as pytest or other tests may have loaded them already
+    result = subprocess.run(
+        [sys.executable, '-c', 'import sys, expense_tracker; print(*sorted(sys.modules))'],
+        cwd=ROOT, capture_output=True, text=True, check=True, env=dict(os.environ, EXPENSE_TRACKER_DB='')
+    )
+    loaded = {name.split('.')[0] for name in result.stdout.split()}
+    assert not loaded & set(LAZY_MODULES)
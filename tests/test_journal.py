@@ -0,0 +1,200 @@
+"""Replaying the transaction journal rebuilds the ledger exactly.
+
+Random sequences of edits (single appends, bulk imports, deletes by ID,
+date range and predicate, and clears) are interleaved with undos, redos and
+compactions. After every step the store's journal is replayed into a fresh
+store and compared with it (`verify_journal`), and the running totals are
+checked against a full recompute (`check_totals`). Copies of the ledger
+taken before every edit check that each undo brings back the previous state
+and each redo the next one.
+
+The undo history is bounded: past UNDO_DEPTH edits or UNDO_MAX_ROWS rows the
+oldest edits are forgotten, and compaction frees the deleted rows only they
+could bring back. Every session undoes and redoes only its own edits.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from expense_core import SQLiteLedger, TransactionStore, store as store_module
+
+STEPS = 25
+ROWS = 300
+
+
+def same_rows(a, b):
+    """Whether two transaction frames hold the same IDs and values"""
+    return a.astype(b.dtypes).equals(b)
+
+
+def random_edit(store, rng, make_ledger):
+    """Apply one random edit to a non-empty store"""
+    frame = store.frame
+    kind = rng.choice(['append', 'extend', 'delete', 'delete_between', 'delete_where', 'clear'],
+                      p=[0.3, 0.15, 0.3, 0.1, 0.1, 0.05])
+    if kind == 'append':
+        row = make_ledger(1, seed=int(rng.integers(1 << 31))).iloc[0]
+        store.append(row['Date'], row['Category'], row['Description'], row['Amount'], row['Type'])
+    elif kind == 'extend':
+        store.extend(make_ledger(int(rng.integers(1, ROWS // 10 + 2)), seed=int(rng.integers(1 << 31))))
+    elif kind == 'delete':
+        store.delete(rng.choice(frame.index, min(len(frame), int(rng.integers(1, 20))), replace=False))
+    elif kind == 'delete_between':
+        start = pd.Timestamp(rng.choice(frame['Date']))
+        store.delete_between(start, start + pd.Timedelta(days=3))
+    elif kind == 'delete_where':
+        category = rng.choice(frame['Category'].cat.categories)
+        store.delete_where(lambda df: df['Category'] == category)
+    else:
+        store.clear()
+
+
+@pytest.fixture
+def checked_totals(monkeypatch):
+    monkeypatch.setattr(TransactionStore, 'check_totals', True)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+@pytest.mark.parametrize('backed', [False, True], ids=['memory', 'sqlite'])
+def test_replay_undo_and_redo_rebuild_the_ledger(make_ledger, tmp_path, checked_totals, seed, backed):
+    rng = np.random.default_rng(seed)
+    db_path = str(tmp_path / 'journal.db')
+    store = TransactionStore(SQLiteLedger(db_path) if backed else None)
+    # Ledger copies before each edit that can be undone, and after each undo that can be redone
+    undo_states, redo_states = [store.frame], []
+    store.extend(make_ledger(ROWS, seed=seed))
+    for _ in range(STEPS):
+        before = store.frame
+        action = rng.choice(['edit', 'undo', 'redo', 'compact'], p=[0.55, 0.25, 0.15, 0.05])
+        if action == 'edit' and len(store):
+            entries = len(store.journal)
+            random_edit(store, rng, make_ledger)
+            if len(store.journal) > entries:
+                undo_states.append(before)
+                redo_states.clear()
+        elif action == 'undo' and store.undo() is not None:
+            redo_states.append(before)
+            assert same_rows(store.frame, undo_states.pop())
+        elif action == 'redo' and store.redo() is not None:
+            undo_states.append(before)
+            assert same_rows(store.frame, redo_states.pop())
+        else:
+            store.compact()
+        store.verify_journal()
+
+    if backed:
+        # Every step was written through to the database
+        assert same_rows(TransactionStore(SQLiteLedger(db_path)).frame, store.frame)
+    while store.undo() is not None:
+        pass
+    assert not len(store)
+
+
+def test_undo_depth_is_bounded(monkeypatch):
+    monkeypatch.setattr(store_module, 'UNDO_DEPTH', 3)
+    store = TransactionStore()
+    for day in range(1, 11):
+        store.append(f'2024-01-{day:02d}', 'Food & Dining', 'Lunch', 10, 'Expense')
+    assert [store.undo() is not None for _ in range(4)] == [True, True, True, False]
+    assert len(store) == 7
+    store.verify_journal()
+
+
+def test_replaced_ledgers_are_freed_past_the_row_budget(make_ledger, monkeypatch, checked_totals):
+    monkeypatch.setattr(store_module, 'UNDO_MAX_ROWS', 100)
+    store = TransactionStore()
+    store.extend(make_ledger(40, seed=0))
+    # Replace the whole ledger again and again, as re-importing a statement does
+    for seed in range(1, 10):
+        previous = store.frame
+        store.clear()
+        store.extend(make_ledger(40, seed=seed))
+        store.compact()
+        store.verify_journal()
+        assert not len(store.journal)
+        # Only the rows the remembered edits refer to are kept besides the live ones
+        assert len(store.journal.held_ids()) <= 100
+        assert len(store.rows()) - len(store) <= 100
+
+    # The clear and import of the last replacement are all that can be undone
+    assert store.undo() is not None and store.undo() is not None
+    assert store.undo() is None
+    assert same_rows(store.frame, previous)
+
+
+def test_sessions_only_undo_their_own_edits(make_ledger, checked_totals):
+    store = TransactionStore()
+    store.extend(make_ledger(50), session='a')
+    added = store.append('2024-05-01', 'Food & Dining', 'Lunch', 12, 'Expense', session='b')
+    deleted = store.frame.index[:5]
+    store.delete(deleted, session='a')
+
+    # b takes back its append, leaving a's later delete in place
+    assert store.undo(session='b')[1].tolist() == [added]
+    assert store.undo(session='b') is None
+    assert len(store) == 45
+    # a brings its deleted rows back, and b can still redo its append
+    assert store.undo(session='a')[1].tolist() == deleted.tolist()
+    assert store.redo(session='b')[1].tolist() == [added]
+    assert len(store) == 51
+    store.verify_journal()
+
+    # Rows another session deleted since are out of reach of undo and redo
+    other = TransactionStore()
+    lunch = other.append('2024-05-01', 'Food & Dining', 'Lunch', 12, 'Expense', session='a')
+    other.delete([lunch], session='b')
+    assert other.undo(session='a') is None and other.redo(session='a') is None
+    assert not len(other)
+    assert other.undo(session='b')[1].tolist() == [lunch]
+
+    other.extend(make_ledger(3), session='a')
+    imported = other.frame.index[1:]
+    other.delete(imported[:1], session='b')
+    assert other.undo(session='a')[1].tolist() == imported[1:].tolist()
+    assert other.redo(session='a')[1].tolist() == imported[1:].tolist()
+    other.clear(session='b')
+    assert other.undo(session='a') is None
+    assert not len(other)
+    other.verify_journal()
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_undo_and_redo_never_touch_rows_another_session_changed_last(make_ledger, seed):
+    rng = np.random.default_rng(seed)
+    store = TransactionStore()
+    store.extend(make_ledger(ROWS, seed=seed))
+    # id -> session that added or deleted the row last
+    owners = {}
+    for _ in range(STEPS * 4):
+        session = str(rng.choice(['a', 'b']))
+        before = set(store.frame.index)
+        action = rng.choice(['edit', 'undo', 'redo'], p=[0.4, 0.35, 0.25])
+        if action == 'edit' and len(store):
+            kind = rng.choice(['append', 'delete', 'clear'], p=[0.4, 0.5, 0.1])
+            if kind == 'append':
+                store.extend(make_ledger(int(rng.integers(1, 10)), seed=int(rng.integers(1 << 31))), session=session)
+            elif kind == 'delete':
+                frame = store.frame
+                store.delete(rng.choice(frame.index, min(len(frame), int(rng.integers(1, 20))), replace=False),
+                             session=session)
+            else:
+                store.clear(session=session)
+        elif action == 'undo':
+            store.undo(session=session)
+        elif action == 'redo':
+            store.redo(session=session)
+        changed = before ^ set(store.frame.index)
+        if action != 'edit':
+            assert all(owners.get(transaction_id) == session for transaction_id in changed)
+        owners.update(dict.fromkeys(changed, session))
+        store.verify_journal()
+
+
+def test_row_budget_forgets_the_oldest_steps_of_any_session(make_ledger, monkeypatch):
+    monkeypatch.setattr(store_module, 'UNDO_MAX_ROWS', 100)
+    store = TransactionStore()
+    store.extend(make_ledger(60), session='a')
+    store.extend(make_ledger(60, seed=1), session='b')
+    assert store.undo(session='a') is None
+    assert store.undo(session='b') is not None
+    store.verify_journal()
@@ -0,0 +1,168 @@
+"""Exact money arithmetic: amounts in cents against Decimal sums.
+
+Random ledgers are built from amounts with up to two decimals and edited
+with random sequences of appends, bulk extends, deletes, undos and redos.
+After every step the store's totals, monthly summary and category totals
+must equal the same sums computed with Decimal arithmetic.
+"""
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from hypothesis.stateful import RuleBasedStateMachine, invariant, precondition, rule
+
+from expense_core import CATEGORIES, TRANSACTION_TYPES, TransactionStore, format_money, to_cents
+from expense_core.schema import MAX_EXACT_FLOAT_CENTS
+
+INT64_MAX = 2 ** 63 - 1
+
+# Amounts passed in as floats must stay within the exact float range
+amounts = st.decimals(min_value=Decimal('0.01'), max_value=Decimal(MAX_EXACT_FLOAT_CENTS).scaleb(-2), places=2)
+transactions = st.tuples(
+    st.dates(datetime.date(2000, 1, 1), datetime.date(2030, 12, 31)),
+    st.sampled_from(CATEGORIES),
+    st.sampled_from(['Lunch', 'Rent', 'Salary', '']),
+    amounts,
+    st.sampled_from(TRANSACTION_TYPES),
+)
+# How amounts are handed to the store: as the form and uploads do, or exactly
+amount_types = st.sampled_from([float, Decimal, str])
+
+
+def in_units(cents):
+    """Amount in cents as an exact Decimal in currency units"""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+@given(st.integers(-MAX_EXACT_FLOAT_CENTS, MAX_EXACT_FLOAT_CENTS))
+def test_float_amounts_convert_exactly_within_bound(cents):
+    assert to_cents(np.array([float(in_units(cents))]))[0] == cents
+
+
+@given(st.integers(-INT64_MAX, INT64_MAX))
+def test_decimal_and_string_amounts_convert_exactly(cents):
+    assert to_cents([in_units(cents)])[0] == cents
+    assert to_cents([str(in_units(cents))])[0] == cents
+    assert to_cents(pd.Series([in_units(cents)], dtype=object))[0] == cents
+
+
+def test_float_amounts_lose_exactness_past_bound():
+    cents = 2 ** 53 + 1
+    assert to_cents([in_units(cents)])[0] == cents
+    assert to_cents(np.array([float(in_units(cents))]))[0] != cents
+
+
+def test_finer_amounts_round_half_to_even():
+    assert to_cents([Decimal('0.125'), Decimal('0.135'), '-0.005']).tolist() == [12, 14, 0]
+    assert to_cents([0.125, 2.5]).tolist() == [12, 250]
+    assert to_cents([3, -7]).tolist() == [300, -700]
+
+
+@given(st.integers(-INT64_MAX, INT64_MAX))
+def test_format_money_is_exact(cents):
+    formatted = format_money(cents, '')
+    assert Decimal(formatted.replace(',', '')) == in_units(cents)
+
+
+class LedgerMachine(RuleBasedStateMachine):
+    """Random edits to a store next to a model of its rows with Decimal amounts"""
+
+    def __init__(self):
+        super().__init__()
+        self.store = TransactionStore()
+        # id -> (date, category, type, amount); the states before each edit
+        # that can be undone, and after each undo that can be redone
+        self.rows = {}
+        self.undo_states = []
+        self.redo_states = []
+
+    def edited(self, rows):
+        self.undo_states.append(self.rows)
+        self.redo_states.clear()
+        self.rows = rows
+
+    @rule(transaction=transactions, amount_type=amount_types)
+    def append(self, transaction, amount_type):
+        date, category, description, amount, transaction_type = transaction
+        transaction_id = self.store.append(date, category, description, amount_type(amount), transaction_type)
+        self.edited({**self.rows, transaction_id: (date, category, transaction_type, amount)})
+
+    @rule(batch=st.lists(transactions, max_size=20), amount_type=amount_types)
+    def extend(self, batch, amount_type):
+        df = pd.DataFrame(batch, columns=['Date', 'Category', 'Description', 'Amount', 'Type'])
+        df['Amount'] = df['Amount'].map(amount_type)
+        added = self.store.extend(df)
+        assert added == len(batch)
+        if added:
+            new_ids = self.store.frame.index[-added:]
+            self.edited({**self.rows, **{
+                transaction_id: (date, category, transaction_type, amount)
+                for transaction_id, (date, category, _, amount, transaction_type) in zip(new_ids, batch)
+            }})
+
+    @precondition(lambda self: self.rows)
+    @rule(data=st.data())
+    def delete(self, data):
+        ids = data.draw(st.lists(st.sampled_from(sorted(self.rows)), min_size=1, max_size=5))
+        assert self.store.delete(ids) == len(set(ids))
+        self.edited({key: row for key, row in self.rows.items() if key not in ids})
+
+    @rule()
+    def undo(self):
+        entry = self.store.undo()
+        assert (entry is None) == (not self.undo_states)
+        if entry is not None:
+            self.redo_states.append(self.rows)
+            self.rows = self.undo_states.pop()
+
+    @rule()
+    def redo(self):
+        entry = self.store.redo()
+        assert (entry is None) == (not self.redo_states)
+        if entry is not None:
+            self.undo_states.append(self.rows)
+            self.rows = self.redo_states.pop()
+
+    @rule()
+    def compact(self):
+        self.store.compact()
+
+    def expected_sums(self, key):
+        """{key(row): [income, expense]} as Decimal sums over the model's rows"""
+        sums = {}
+        for row in self.rows.values():
+            income_expense = sums.setdefault(key(row), [Decimal(0), Decimal(0)])
+            income_expense[TRANSACTION_TYPES.index(row[2])] += row[3]
+        return sums
+
+    @invariant()
+    def totals_are_exact(self):
+        income, expense = self.expected_sums(lambda row: None).get(None, [Decimal(0), Decimal(0)])
+        assert [in_units(cents) for cents in self.store.totals] == [income, expense, income - expense]
+        assert len(self.store) == len(self.rows)
+
+    @invariant()
+    def monthly_summary_is_exact(self):
+        monthly = {
+            str(month): [in_units(income), in_units(expense), in_units(balance)]
+            for month, income, expense, balance in self.store.monthly_summary().itertuples()
+        }
+        expected = self.expected_sums(lambda row: row[0].strftime('%Y-%m'))
+        assert monthly == {month: [income, expense, income - expense] for month, (income, expense) in expected.items()}
+
+    @invariant()
+    def category_totals_are_exact(self):
+        expected = self.expected_sums(lambda row: (row[2], row[1]))
+        for transaction_type in TRANSACTION_TYPES:
+            totals = self.store.category_totals(transaction_type)
+            totals = {category: in_units(cents) for category, cents in totals.items()}
+            column = TRANSACTION_TYPES.index(transaction_type)
+            assert totals == {category: sums[column] for (kind, category), sums in expected.items()
+                              if kind == transaction_type}
+
+
+TestLedgerMachine = LedgerMachine.TestCase
+TestLedgerMachine.settings = settings(max_examples=50, stateful_step_count=30, deadline=None)